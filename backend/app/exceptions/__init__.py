@@ -19,6 +19,17 @@ from .payments_exceptions import (
     InvalidPaymentTypeException,
     InvalidManagerException,
 )
+from .admin_exceptions import (
+    AdminException,
+    AdminDisabledException,
+    AdminUnauthorizedException,
+    ProfilerBusyException,
+)
+from .telemetry_exceptions import (
+    TelemetryException,
+    TelemetryInvalidPayloadException,
+    TelemetryRateLimitedException,
+)
 from .service_exceptions import (
     FirebaseException,
     FirebaseConnectionException,
@@ -30,4 +41,7 @@ from .service_exceptions import (
     S3UploadException,
     S3PresignedException,
     S3ConfigException,
+    ServiceOverloadedException,
+    CircuitOpenException,
+    RateLimitedException,
 )
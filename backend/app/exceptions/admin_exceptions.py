@@ -0,0 +1,40 @@
+from fastapi import HTTPException, status
+
+
+class AdminException(HTTPException):
+    """Base exception for admin endpoint errors."""
+
+    def __init__(
+        self, detail: str, status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR
+    ):
+        super().__init__(detail=detail, status_code=status_code)
+
+
+class AdminDisabledException(AdminException):
+    """Raised when an admin feature is not enabled on this server."""
+
+    def __init__(self, feature: str):
+        super().__init__(
+            detail=f"{feature} is not enabled",
+            status_code=status.HTTP_404_NOT_FOUND,
+        )
+
+
+class AdminUnauthorizedException(AdminException):
+    """Raised when the admin token is missing or wrong."""
+
+    def __init__(self):
+        super().__init__(
+            detail="Invalid or missing admin token",
+            status_code=status.HTTP_403_FORBIDDEN,
+        )
+
+
+class ProfilerBusyException(AdminException):
+    """Raised when a profile is already running in this worker."""
+
+    def __init__(self):
+        super().__init__(
+            detail="A profile is already running in this worker",
+            status_code=status.HTTP_409_CONFLICT,
+        )
@@ -104,3 +104,37 @@ class S3ConfigException(S3Exception):
             detail=f"S3 configuration error: {reason}",
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
         )
+
+
+# --- Backpressure ---
+class ServiceOverloadedException(HTTPException):
+    """Raised when a dependency has no free capacity within the wait budget."""
+
+    def __init__(self, dependency: str, retry_after: int = 1):
+        super().__init__(
+            detail=f"Service overloaded: too many concurrent {dependency} requests",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class CircuitOpenException(HTTPException):
+    """Raised when an operation's circuit breaker is open (failing fast)."""
+
+    def __init__(self, operation: str, retry_after: int):
+        super().__init__(
+            detail=f"Service temporarily unavailable: {operation} is failing",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class RateLimitedException(HTTPException):
+    """Raised when a kiosk or client sends write requests faster than allowed."""
+
+    def __init__(self, subject: str, retry_after: float):
+        super().__init__(
+            detail=f"Too many requests from {subject}",
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+        )
@@ -0,0 +1,34 @@
+from fastapi import HTTPException, status
+
+
+class TelemetryException(HTTPException):
+    """Base exception for weight telemetry errors."""
+
+    def __init__(
+        self,
+        detail: str,
+        status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR,
+        headers: dict = None,
+    ):
+        super().__init__(detail=detail, status_code=status_code, headers=headers)
+
+
+class TelemetryInvalidPayloadException(TelemetryException):
+    """Raised when a telemetry batch cannot be decoded or is too large."""
+
+    def __init__(self, reason: str):
+        super().__init__(
+            detail=f"Invalid telemetry payload: {reason}",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+
+
+class TelemetryRateLimitedException(TelemetryException):
+    """Raised when a kiosk sends telemetry batches faster than allowed."""
+
+    def __init__(self, kid: str, retry_after: float):
+        super().__init__(
+            detail=f"Too many telemetry batches from kiosk {kid}",
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+        )
@@ -5,16 +5,19 @@ This package contains Pydantic models organized by domain:
 - product: Product-related models and API request/response models
 - kiosk: Kiosk-related models and API request/response models
 - payment: Payment-related API request/response models
+- telemetry: Weight telemetry ingestion models
 """
 
 # Kiosk models
 from app.models.kiosks_model import (
     Kiosk,
+    KioskOut,
     RegisterKioskRequest,
     RegisterKioskResponse,
     AddProductToKioskRequest,
     AddProductToKioskResponse,
     GetKioskProductsResponse,
+    KioskSyncResponse,
     DeleteKioskResponse,
     DeleteProductFromKioskResponse,
 )
@@ -33,20 +36,29 @@ from app.models.products_model import (
 # Payment models
 from app.models.payments_model import (
     Payment,
+    TransactionOut,
     PaymentRequest,
     PaymentResponse,
     PaymentApproveRequest,
     PaymentApproveResponse,
 )
 
+# Telemetry models
+from app.models.telemetry_model import (
+    WeightTelemetryBatch,
+    WeightTelemetryResponse,
+)
+
 __all__ = [
     # Kiosk
     "Kiosk",
+    "KioskOut",
     "RegisterKioskRequest",
     "RegisterKioskResponse",
     "AddProductToKioskRequest",
     "AddProductToKioskResponse",
     "GetKioskProductsResponse",
+    "KioskSyncResponse",
     "DeleteKioskResponse",
     "DeleteProductFromKioskResponse",
     # Product
@@ -59,8 +71,12 @@ __all__ = [
     "GetProductImageUrlResponse",
     # Payment
     "Payment",
+    "TransactionOut",
     "PaymentRequest",
     "PaymentResponse",
     "PaymentApproveRequest",
     "PaymentApproveResponse",
+    # Telemetry
+    "WeightTelemetryBatch",
+    "WeightTelemetryResponse",
 ]
@@ -1,6 +1,7 @@
 # /kiosks로 들어오는 요청을 처리하는 데 필요한 객체
 
 from __future__ import annotations
+from datetime import datetime
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from app.models.products_model import Product
@@ -16,6 +17,16 @@ class Kiosk(BaseModel):
     products: List[Dict[str, Any]] = []  # List of {"pid": str, "available": bool}
 
 
+class KioskOut(BaseModel):
+    kiosk_id: str  # Firestore document ID
+    name: str
+    location: str
+    status: str = "active"
+    products: List[Dict[str, Any]] = []
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
 class KioskProductItem(BaseModel):
     product: "Product"
     available: bool
@@ -43,6 +54,14 @@ class GetKioskProductsResponse(BaseModel):
     products: List[KioskProductItem]
 
 
+class KioskSyncResponse(BaseModel):
+    kid: str
+    version: int
+    full: bool  # True if products is a full snapshot rather than a delta
+    products: List[KioskProductItem]  # Added or changed since the given version
+    removed: List[str] = []  # pids removed since the given version
+
+
 class AddProductToKioskRequest(BaseModel):
     pid: str
 
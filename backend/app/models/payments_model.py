@@ -19,6 +19,23 @@ class Payment(BaseModel):
     approved_at: Optional[datetime] = None
 
 
+class TransactionOut(BaseModel):
+    transaction_id: str  # 거래 ID (Firestore document ID)
+    kid: str
+    pid: str
+    amount_grams: int
+    extra_bottle: bool
+    product_price: int
+    total_price: int
+    payment_method: str
+    manager: str
+    status: str = "ONGOING"
+    completed: bool = False
+    created_at: Optional[datetime] = None
+    approved_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
 class PaymentRequest(BaseModel):
     kid: str
     pid: str
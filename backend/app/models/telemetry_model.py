@@ -0,0 +1,24 @@
+# /telemetry로 들어오는 요청을 처리하는 데 필요한 객체
+
+from typing import Annotated, List, Optional, Tuple
+from pydantic import BaseModel, Field
+
+# Sample timestamps in epoch milliseconds, 2020-01-01 to 2100-01-01 (UTC)
+TimestampMs = Annotated[int, Field(ge=1_577_836_800_000, lt=4_102_444_800_000)]
+
+
+class WeightTelemetryBatch(BaseModel):
+    # both become part of the bucket document ID, so no "/" (path separator)
+    kid: str = Field(..., min_length=1, max_length=128, pattern=r"^[^/]+$")
+    session_id: str = Field(  # 키오스크 측정 세션 ID
+        ..., min_length=1, max_length=128, pattern=r"^[^/]+$"
+    )
+    txid: Optional[str] = None  # 결제와 연결할 거래 ID
+    # (timestamp_ms, grams) pairs, compact to keep batches small
+    samples: List[Tuple[TimestampMs, float]] = []
+    stable_weight: Optional[float] = None  # 최종 안정 무게 (txid가 있을 때 거래에 기록)
+
+
+class WeightTelemetryResponse(BaseModel):
+    accepted: int  # number of samples stored
+    buckets: int  # number of per-minute documents written
@@ -0,0 +1,72 @@
+# /admin 으로 들어오는 API 요청들을 처리하는 파일
+
+import asyncio
+import os
+import secrets
+from datetime import datetime
+
+from fastapi import APIRouter, Header, Query, Response, status
+
+from app.exceptions import (
+    AdminDisabledException,
+    AdminUnauthorizedException,
+    ProfilerBusyException,
+)
+from app.services.profiler import sampling_profiler
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def _check_admin_token(token: str) -> None:
+    """Profiling is opt-in: disabled unless ADMIN_PROFILER_TOKEN is set"""
+    expected = os.getenv("ADMIN_PROFILER_TOKEN")
+    if not expected:
+        raise AdminDisabledException("Profiling")
+    if not token or not secrets.compare_digest(token, expected):
+        raise AdminUnauthorizedException()
+
+
+@router.get("/profile", status_code=status.HTTP_200_OK, include_in_schema=False)
+async def profile_worker(
+    seconds: float = Query(10, gt=0, le=120, description="Sampling duration"),
+    interval_ms: float = Query(5, ge=1, le=100, description="Sampling interval"),
+    x_admin_token: str = Header(""),
+):
+    """
+    Sample this worker's stacks for N seconds and return collapsed stacks
+
+    Requests keep being served while sampling, so run load against the
+    worker during the profile. The output opens in speedscope or
+    flamegraph.pl (e.g. to see Pydantic validation, generate_qr_code and
+    Firestore deserialization inside FirebaseService).
+
+    Args:
+        seconds (float): Sampling duration in seconds (max 120)
+        interval_ms (float): Sampling interval in milliseconds
+        x_admin_token (str): Must match ADMIN_PROFILER_TOKEN
+
+    Returns:
+        Response: text/plain collapsed-stack file
+
+    Raises:
+        AdminDisabledException: 404 if ADMIN_PROFILER_TOKEN is not set
+        AdminUnauthorizedException: 403 if the token is missing or wrong
+        ProfilerBusyException: 409 if a profile is already running
+    """
+    _check_admin_token(x_admin_token)
+    if sampling_profiler.busy:
+        raise ProfilerBusyException()
+
+    # Sample from a worker thread so the event loop keeps serving requests
+    collapsed = await asyncio.to_thread(
+        sampling_profiler.profile, seconds, interval_ms / 1000
+    )
+    if collapsed is None:
+        raise ProfilerBusyException()
+
+    filename = f"profile-{os.getpid()}-{datetime.now():%Y%m%d-%H%M%S}.collapsed"
+    return Response(
+        content=collapsed,
+        media_type="text/plain",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
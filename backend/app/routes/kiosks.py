@@ -2,7 +2,7 @@
 
 from typing import List
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Depends, Query, status
 
 from app.exceptions import (
     KioskInvalidDataException,
@@ -16,33 +16,40 @@ from app.models import (
     DeleteProductFromKioskResponse,
     GetKioskProductsResponse,
     Kiosk,
+    KioskOut,
+    KioskSyncResponse,
     RegisterKioskRequest,
     RegisterKioskResponse,
 )
+from app.routes.rate_limits import limit_writes
+from app.routes.responses import model_list_response, model_response
 from app.services.firebase import firebase_service
 
 
 router = APIRouter(prefix="/kiosks", tags=["kiosk"])
 
 
-@router.get("/", response_model=List[dict], status_code=status.HTTP_200_OK)
-async def get_all_kiosks():
+@router.get("/", response_model=List[KioskOut], status_code=status.HTTP_200_OK)
+def get_all_kiosks():
     """
     Get all registered kiosks.
 
     Returns:
-        List of kiosk objects with kiosk_id, name, location, status, products
+        List[KioskOut]: Kiosk objects with kiosk_id, name, location, status, products
 
     Raises:
         KioskException: 500 for database or other kiosk-related errors
     """
-    return firebase_service.get_all_kiosks()
+    return model_list_response(KioskOut, firebase_service.get_all_kiosks())
 
 
 @router.post(
-    "/", response_model=RegisterKioskResponse, status_code=status.HTTP_201_CREATED
+    "/",
+    response_model=RegisterKioskResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_writes)],
 )
-async def register_kiosk(request: RegisterKioskRequest):
+def register_kiosk(request: RegisterKioskRequest):
     """
     Register a new kiosk.
 
@@ -56,6 +63,7 @@ async def register_kiosk(request: RegisterKioskRequest):
         KioskInvalidDataException: 400 if name or location is empty
         KioskAlreadyExistsException: 409 if kiosk already exists
         KioskException: 500 for other kiosk-related errors
+        RateLimitedException: 429 if the kiosk or client sends requests too fast
     """
     # Additional validation for empty strings (after stripping whitespace)
     if not request.name.strip():
@@ -80,7 +88,7 @@ async def register_kiosk(request: RegisterKioskRequest):
 
 
 @router.get("/{kid}", response_model=Kiosk, status_code=status.HTTP_200_OK)
-async def get_kiosk(kid: str):
+def get_kiosk(kid: str):
     """
     Get a specific kiosk by ID
 
@@ -95,13 +103,16 @@ async def get_kiosk(kid: str):
         KioskException: 500 for other errors
     """
     kiosk = firebase_service.get_kiosk_by_id(kid)
-    return kiosk
+    return model_response(kiosk)
 
 
 @router.delete(
-    "/{kid}", response_model=DeleteKioskResponse, status_code=status.HTTP_200_OK
+    "/{kid}",
+    response_model=DeleteKioskResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(limit_writes)],
 )
-async def delete_kiosk(kid: str):
+def delete_kiosk(kid: str):
     """
     Delete a kiosk by ID
 
@@ -114,6 +125,7 @@ async def delete_kiosk(kid: str):
     Raises:
         KioskNotFoundException: 404 if kiosk not found
         KioskException: 500 for other errors
+        RateLimitedException: 429 if the kiosk or client sends requests too fast
     """
     firebase_service.delete_kiosk(kid)
     return DeleteKioskResponse(message=f"Kiosk {kid} deleted successfully")
@@ -124,45 +136,62 @@ async def delete_kiosk(kid: str):
     response_model=GetKioskProductsResponse,
     status_code=status.HTTP_200_OK,
 )
-async def get_kiosk_products(kid: str):
+def get_kiosk_products(kid: str):
     """
     Get all products available at a specific kiosk with full product details
 
     Args:
         kid: Kiosk ID
 
+    Served from the denormalized kiosk_catalogs/{kid} document in a single read.
+
     Returns:
         GetKioskProductsResponse: List of products with kiosk-specific availability
 
     Raises:
         KioskNotFoundException: 404 if kiosk not found
-        ProductNotFoundException: 404 if any product not found
+        ProductDataCorruptedException: 500 if catalog product data is corrupted
         KioskException: 500 for other errors
-        ProductException: 500 for other errors
     """
-    kiosk = firebase_service.get_kiosk_by_id(kid)
+    products = firebase_service.get_kiosk_catalog(kid)
+    return model_response(GetKioskProductsResponse(products=products))
 
-    if not kiosk.products:
-        return GetKioskProductsResponse(products=[])
 
-    products = []
-    for kiosk_prod in kiosk.products:
-        product_id = kiosk_prod.get("pid")
-        kiosk_available = kiosk_prod.get("available", False)
+@router.get(
+    "/{kid}/sync",
+    response_model=KioskSyncResponse,
+    status_code=status.HTTP_200_OK,
+)
+def sync_kiosk(
+    kid: str,
+    since: int = Query(0, ge=0, description="Last catalog version seen by the kiosk"),
+):
+    """
+    Get product and assignment changes for a kiosk since a catalog version
 
-        product = firebase_service.get_product_by_id(product_id)
+    Args:
+        kid: Kiosk ID
+        since: Catalog version the kiosk already has (0 for a full snapshot)
 
-        products.append({"product": product, "available": kiosk_available})
+    Returns:
+        KioskSyncResponse: Current version, changed products and removed pids
 
-    return GetKioskProductsResponse(products=products)
+    Raises:
+        KioskNotFoundException: 404 if kiosk not found
+        ProductDataCorruptedException: 500 if catalog product data is corrupted
+        KioskException: 500 for other errors
+    """
+    sync = firebase_service.get_kiosk_sync(kid, since)
+    return model_response(KioskSyncResponse.model_validate(sync))
 
 
 @router.post(
     "/{kid}/products",
     response_model=AddProductToKioskResponse,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(limit_writes)],
 )
-async def add_product_to_kiosk(kid: str, request: AddProductToKioskRequest):
+def add_product_to_kiosk(kid: str, request: AddProductToKioskRequest):
     """
     Add a product to a kiosk
 
@@ -179,8 +208,9 @@ async def add_product_to_kiosk(kid: str, request: AddProductToKioskRequest):
         ProductAlreadyExistsException: 409 if product already exists in kiosk
         KioskException: 500 for database or other kiosk-related errors
         ProductException: 500 for product-related errors
+        RateLimitedException: 429 if the kiosk or client sends requests too fast
     """
-    kiosk = firebase_service.get_kiosk_by_id(kid)
+    kiosk = firebase_service.get_kiosk_by_id(kid, consistent=True)
     product = firebase_service.get_product_by_id(request.pid)
 
     if any(p.get("pid") == product.pid for p in kiosk.products):
@@ -201,8 +231,9 @@ async def add_product_to_kiosk(kid: str, request: AddProductToKioskRequest):
     "/{kid}/products/{pid}",
     response_model=DeleteProductFromKioskResponse,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(limit_writes)],
 )
-async def remove_product_from_kiosk(kid: str, pid: str):
+def remove_product_from_kiosk(kid: str, pid: str):
     """
     Delete a product from a kiosk
 
@@ -217,8 +248,9 @@ async def remove_product_from_kiosk(kid: str, pid: str):
         KioskNotFoundException: 404 if kiosk not found
         ProductNotAssignedException: 404 if product not assigned to kiosk
         KioskException: 500 for database or other kiosk-related errors
+        RateLimitedException: 429 if the kiosk or client sends requests too fast
     """
-    kiosk = firebase_service.get_kiosk_by_id(kid)
+    kiosk = firebase_service.get_kiosk_by_id(kid, consistent=True)
 
     product_found = False
     updated_products = []
@@ -4,7 +4,7 @@ import base64
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Query, status
+from fastapi import APIRouter, Depends, Query, status
 
 from app.exceptions import (
     InvalidManagerException,
@@ -17,15 +17,23 @@ from app.models import (
     PaymentApproveResponse,
     PaymentRequest,
     PaymentResponse,
+    TransactionOut,
 )
+from app.routes.rate_limits import limit_writes
+from app.routes.responses import model_list_response, model_response
 from app.services.firebase import firebase_service
 from app.services.qrcode_generator import qrcode_service
 
 router = APIRouter(prefix="/payments", tags=["payments"])
 
 
-@router.post("/", response_model=PaymentResponse, status_code=status.HTTP_200_OK)
-async def request_payment(request: PaymentRequest):
+@router.post(
+    "/",
+    response_model=PaymentResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(limit_writes)],
+)
+def request_payment(request: PaymentRequest):
     """
     Prepare a payment and generate QR code
 
@@ -45,6 +53,7 @@ async def request_payment(request: PaymentRequest):
         KioskException: 500 for kiosk-related errors
         ProductException: 500 for product-related errors
         PaymentException: 500 for transaction creation errors
+        RateLimitedException: 429 if the kiosk or client sends requests too fast
     """
     # 1. Validate kiosk and product exist
     kiosk = firebase_service.get_kiosk_by_id(request.kid)
@@ -80,9 +89,12 @@ async def request_payment(request: PaymentRequest):
 
 
 @router.post(
-    "/approve", response_model=PaymentApproveResponse, status_code=status.HTTP_200_OK
+    "/approve",
+    response_model=PaymentApproveResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(limit_writes)],
 )
-async def approve_payment(request: PaymentApproveRequest):
+def approve_payment(request: PaymentApproveRequest):
     """
     Approve a payment after user completes payment
 
@@ -96,6 +108,7 @@ async def approve_payment(request: PaymentApproveRequest):
         PaymentNotFoundException: 404 if transaction not found
         PaymentAlreadyCompletedException: 400 if payment already completed
         PaymentException: 500 for database or other payment-related errors
+        RateLimitedException: 429 if the kiosk or client sends requests too fast
     """
     transaction = firebase_service.get_transaction_by_id(request.txid)
 
@@ -108,26 +121,80 @@ async def approve_payment(request: PaymentApproveRequest):
     return PaymentApproveResponse(message="success")
 
 
-@router.get("/transactions", response_model=List[dict], status_code=status.HTTP_200_OK)
-async def get_transactions(
+@router.get(
+    "/transactions", response_model=List[TransactionOut], status_code=status.HTTP_200_OK
+)
+def get_transactions(
     kiosk_id: Optional[str] = Query(None, description="Filter by kiosk ID"),
-    limit: Optional[int] = Query(None, description="Limit number of results"),
+    status_filter: Optional[str] = Query(
+        None, alias="status", description="Filter by status (ONGOING, COMPLETED)"
+    ),
+    payment_method: Optional[str] = Query(None, description="Filter by payment method"),
+    manager: Optional[str] = Query(None, description="Filter by manager"),
+    pid: Optional[str] = Query(None, description="Filter by product ID"),
+    start_date: Optional[datetime] = Query(
+        None, description="Created at or after (ISO 8601, KST if no offset)"
+    ),
+    end_date: Optional[datetime] = Query(
+        None, description="Created at or before (ISO 8601, KST if no offset)"
+    ),
+    limit: Optional[int] = Query(None, ge=1, description="Limit number of results"),
 ):
     """
-    Get all transactions with optional filters
+    Get transactions, newest first, with optional filters
+
+    Every filter is served by an index declared in firestore.indexes.json.
 
     Args:
         kiosk_id (Optional[str]): Optional kiosk ID to filter transactions
+        status (Optional[str]): Optional transaction status
+        payment_method (Optional[str]): Optional payment method (kakaopay, tosspay)
+        manager (Optional[str]): Optional manager
+        pid (Optional[str]): Optional product ID
+        start_date (Optional[datetime]): Optional start of the created_at range
+        end_date (Optional[datetime]): Optional end of the created_at range
         limit (Optional[int]): Optional limit on number of results
 
     Returns:
-        List[dict]: List of transaction objects
+        List[TransactionOut]: List of transaction objects
+
+    Raises:
+        PaymentException: 500 for database or other payment-related errors
+    """
+    filters = {
+        "kid": kiosk_id,
+        "status": status_filter,
+        "payment_method": payment_method,
+        "manager": manager,
+        "pid": pid,
+    }
+    transactions = firebase_service.query_transactions(
+        {field: value for field, value in filters.items() if value},
+        start=start_date,
+        end=end_date,
+        limit=limit,
+    )
+    return model_list_response(TransactionOut, transactions)
+
+
+@router.get(
+    "/transactions/{txid}",
+    response_model=TransactionOut,
+    status_code=status.HTTP_200_OK,
+)
+def get_transaction(txid: str):
+    """
+    Get a specific transaction by ID
+
+    Args:
+        txid (str): Transaction ID
+
+    Returns:
+        TransactionOut: Transaction details (same shape as /transactions entries),
+            including ones still in the write-behind queue
 
     Raises:
+        PaymentNotFoundException: 404 if transaction not found
         PaymentException: 500 for database or other payment-related errors
     """
-    if kiosk_id:
-        transactions = firebase_service.get_transactions_by_kiosk(kiosk_id)
-    else:
-        transactions = firebase_service.get_all_transactions(limit=limit)
-    return transactions
+    return model_response(firebase_service.get_transaction(txid))
@@ -2,7 +2,7 @@
 
 from typing import List
 
-from fastapi import APIRouter, File, status, UploadFile
+from fastapi import APIRouter, Depends, File, status, UploadFile
 
 from app.models import (
     DeleteProductResponse,
@@ -13,6 +13,8 @@ from app.models import (
     UpdateProductResponse,
     UploadProductImageResponse,
 )
+from app.routes.rate_limits import limit_writes
+from app.routes.responses import model_list_response, model_response
 from app.services.firebase import firebase_service
 
 
@@ -20,7 +22,7 @@ router = APIRouter(prefix="/products", tags=["products"])
 
 
 @router.get("/", response_model=List[Product], status_code=status.HTTP_200_OK)
-async def get_all_products():
+def get_all_products():
     """
     Get all products
 
@@ -31,13 +33,16 @@ async def get_all_products():
         ProductDataCorruptedException: 500 if product data is corrupted
         ProductException: 500 for database or other product-related errors
     """
-    return firebase_service.get_all_products()
+    return model_list_response(Product, firebase_service.get_all_products())
 
 
 @router.post(
-    "/", response_model=RegisterProductResponse, status_code=status.HTTP_201_CREATED
+    "/",
+    response_model=RegisterProductResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_writes)],
 )
-async def register_product(product_request: RegisterProductRequest):
+def register_product(product_request: RegisterProductRequest):
     """
     Register a new product
 
@@ -49,6 +54,7 @@ async def register_product(product_request: RegisterProductRequest):
 
     Raises:
         ProductException: 500 for database or other product-related errors
+        RateLimitedException: 429 if the client sends requests too fast
     """
     product_data = product_request.model_dump()
     product_id = firebase_service.register_product(product_data)
@@ -57,7 +63,7 @@ async def register_product(product_request: RegisterProductRequest):
 
 
 @router.get("/{pid}", response_model=Product, status_code=status.HTTP_200_OK)
-async def get_product_by_id(pid: str):
+def get_product_by_id(pid: str):
     """
     Get a specific product by ID
 
@@ -71,13 +77,16 @@ async def get_product_by_id(pid: str):
         ProductNotFoundException: 404 if product not found
         ProductException: 500 for database or other product-related errors
     """
-    return firebase_service.get_product_by_id(pid)
+    return model_response(firebase_service.get_product_by_id(pid))
 
 
 @router.put(
-    "/{pid}", response_model=UpdateProductResponse, status_code=status.HTTP_200_OK
+    "/{pid}",
+    response_model=UpdateProductResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(limit_writes)],
 )
-async def update_product(pid: str, product_request: RegisterProductRequest):
+def update_product(pid: str, product_request: RegisterProductRequest):
     """
     Update a product by ID
 
@@ -91,6 +100,7 @@ async def update_product(pid: str, product_request: RegisterProductRequest):
     Raises:
         ProductNotFoundException: 404 if product not found
         ProductException: 500 for database or other product-related errors
+        RateLimitedException: 429 if the client sends requests too fast
     """
     product_data = product_request.model_dump()
     firebase_service.update_product(pid, product_data)
@@ -98,9 +108,12 @@ async def update_product(pid: str, product_request: RegisterProductRequest):
 
 
 @router.delete(
-    "/{pid}", response_model=DeleteProductResponse, status_code=status.HTTP_200_OK
+    "/{pid}",
+    response_model=DeleteProductResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(limit_writes)],
 )
-async def delete_product(pid: str):
+def delete_product(pid: str):
     """
     Delete a product by ID
 
@@ -113,6 +126,7 @@ async def delete_product(pid: str):
     Raises:
         ProductNotFoundException: 404 if product not found
         ProductException: 500 for database or other product-related errors
+        RateLimitedException: 429 if the client sends requests too fast
     """
     firebase_service.delete_product(pid)
     return DeleteProductResponse(message=f"Product {pid} deleted successfully")
@@ -122,8 +136,9 @@ async def delete_product(pid: str):
     "/{pid}/image",
     response_model=UploadProductImageResponse,
     status_code=status.HTTP_200_OK,
+    dependencies=[Depends(limit_writes)],
 )
-async def upload_product_image(pid: str, file: UploadFile = File(...)):
+def upload_product_image(pid: str, file: UploadFile = File(...)):
     """
     Upload an image for a product to S3
 
@@ -139,6 +154,7 @@ async def upload_product_image(pid: str, file: UploadFile = File(...)):
         S3ConfigException: 503 if S3 service not configured
         S3UploadException: 500 if S3 upload fails
         ProductException: 500 for database or other product-related errors
+        RateLimitedException: 429 if the client sends requests too fast
     """
     content_type = file.content_type or "image/png"
     filename = file.filename or "image.png"
@@ -157,7 +173,7 @@ async def upload_product_image(pid: str, file: UploadFile = File(...)):
     response_model=GetProductImageUrlResponse,
     status_code=status.HTTP_200_OK,
 )
-async def get_product_image_url(pid: str, expires_in: int = 3600):
+def get_product_image_url(pid: str, expires_in: int = 3600):
     """
     Get presigned URL for product image
 
@@ -0,0 +1,72 @@
+# 쓰기 API 요청 속도 제한 (키오스크별, 클라이언트 IP별)
+
+import json
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+
+from app.exceptions import RateLimitedException
+from app.services.metrics import metrics
+from app.services.rate_limiter import limiter_from_env
+
+# (tokens per second, burst) defaults; override with <NAME>_RATE / <NAME>_BURST
+LIMITS = {
+    "rate_limit_kiosk": (2.0, 10.0),
+    "rate_limit_client": (5.0, 20.0),
+}
+
+
+@lru_cache(maxsize=None)
+def _limiter(name: str):
+    # built on first use so settings from .env are already loaded
+    return limiter_from_env(name, *LIMITS[name])
+
+
+async def _request_kid(request: Request) -> Optional[str]:
+    """Kiosk ID from the path, or from a JSON body (e.g. PaymentRequest.kid)"""
+    kid = request.path_params.get("kid")
+    if kid or "json" not in request.headers.get("content-type", ""):
+        return kid
+    try:
+        body = json.loads(await request.body())
+    except ValueError:
+        return None
+    kid = body.get("kid") if isinstance(body, dict) else None
+    return kid if isinstance(kid, str) else None
+
+
+def _check(name: str, subject: str) -> None:
+    retry_after = _limiter(name).acquire(subject)
+    if retry_after:
+        metrics.rate_limited.inc(name.removeprefix("rate_limit_"))
+        raise RateLimitedException(subject, retry_after)
+
+
+async def limit_client(request: Request) -> None:
+    """
+    Route dependency taking one token from the client IP's bucket, without
+    reading the request body.
+
+    Raises:
+        RateLimitedException: 429 with Retry-After if the bucket is empty
+    """
+    # acquire() may block on the shared SQLite store, so keep it off the loop
+    client = request.client.host if request.client else "unknown"
+    await run_in_threadpool(_check, "rate_limit_client", f"client {client}")
+
+
+async def limit_writes(request: Request) -> None:
+    """
+    Route dependency for write endpoints: one token from the client IP's
+    bucket and, when the request names a kiosk, one from that kiosk's bucket.
+
+    Raises:
+        RateLimitedException: 429 with Retry-After if either bucket is empty
+    """
+    await limit_client(request)
+
+    kid = await _request_kid(request)
+    if kid:
+        await run_in_threadpool(_check, "rate_limit_kiosk", f"kiosk {kid}")
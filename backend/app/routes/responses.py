@@ -0,0 +1,45 @@
+# 라우터에서 공통으로 사용하는 응답 헬퍼
+
+from functools import lru_cache
+from typing import List, Sequence, Type
+
+from fastapi import Response, status
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def model_list_response(
+    model: Type[BaseModel],
+    items: Sequence[BaseModel],
+    status_code: int = status.HTTP_200_OK,
+) -> Response:
+    """
+    Serialize already-validated models straight to JSON bytes.
+
+    Returning a Response skips FastAPI's response_model validation, so models
+    built by the service layer are validated exactly once. The route should
+    still declare response_model so the OpenAPI schema stays accurate.
+    """
+    return Response(
+        content=_list_adapter(model).dump_json(items),
+        status_code=status_code,
+        media_type="application/json",
+    )
+
+
+def model_response(model: BaseModel, status_code: int = status.HTTP_200_OK) -> Response:
+    """
+    Single-model counterpart of model_list_response.
+
+    FastAPI dumps a returned model to a dict and validates it again against
+    response_model; returning its JSON bytes skips that second pass.
+    """
+    return Response(
+        content=model.model_dump_json(),
+        status_code=status_code,
+        media_type="application/json",
+    )
@@ -0,0 +1,140 @@
+# /telemetry 로 들어오는 API 요청들을 처리하는 파일
+
+import zlib
+from functools import lru_cache
+
+from fastapi import APIRouter, Depends, Request, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+
+from app.exceptions import (
+    TelemetryInvalidPayloadException,
+    TelemetryRateLimitedException,
+)
+from app.models import WeightTelemetryBatch, WeightTelemetryResponse
+from app.routes.rate_limits import limit_client
+from app.services.firebase import firebase_service
+from app.services.rate_limiter import limiter_from_env
+
+router = APIRouter(prefix="/telemetry", tags=["telemetry"])
+
+MAX_BODY_BYTES = 1 << 20  # both as sent and decompressed
+MAX_SAMPLES_PER_BATCH = 5000
+
+
+@lru_cache(maxsize=None)
+def telemetry_limiter():
+    """Batches per kiosk: TELEMETRY_RATE per second, bursts of TELEMETRY_BURST"""
+    # built on first use so settings from .env are already loaded
+    return limiter_from_env("telemetry", 1, 5)
+
+
+def _too_large() -> TelemetryInvalidPayloadException:
+    return TelemetryInvalidPayloadException(f"body larger than {MAX_BODY_BYTES} bytes")
+
+
+async def _read_body(request: Request) -> bytes:
+    """
+    Read the request body, inflating it if sent with Content-Encoding
+    gzip/deflate. Reading stops as soon as either the body as sent or the
+    inflated body exceeds MAX_BODY_BYTES.
+    """
+    encoding = request.headers.get("content-encoding", "identity").lower()
+    if encoding not in ("identity", "gzip", "deflate"):
+        raise TelemetryInvalidPayloadException(f"unsupported encoding {encoding}")
+    if int(request.headers.get("content-length") or 0) > MAX_BODY_BYTES:
+        raise _too_large()
+
+    chunks = []
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > MAX_BODY_BYTES:
+            raise _too_large()
+        chunks.append(chunk)
+    data = b"".join(chunks)
+
+    if encoding in ("gzip", "deflate"):
+        # wbits 47 (32 + 15) auto-detects a gzip or zlib header; "deflate"
+        # should be zlib-wrapped (15), but some clients send raw deflate (-15)
+        attempts = (47,) if encoding == "gzip" else (15, -15)
+        for wbits in attempts:
+            try:
+                inflater = zlib.decompressobj(wbits)
+                data = inflater.decompress(data, MAX_BODY_BYTES + 1)
+                break
+            except zlib.error as e:
+                error = e
+        else:
+            raise TelemetryInvalidPayloadException(
+                f"bad {encoding} body: {error}"
+            ) from error
+
+    if len(data) > MAX_BODY_BYTES:
+        raise _too_large()
+    return data
+
+
+@router.post(
+    "/weights",
+    response_model=WeightTelemetryResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    # checked before the body is inflated and parsed
+    dependencies=[Depends(limit_client)],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": WeightTelemetryBatch.model_json_schema()}
+            },
+        }
+    },
+)
+async def ingest_weights(request: Request):
+    """
+    Ingest a batch of weight samples from a kiosk measurement session
+
+    The body is a WeightTelemetryBatch, optionally compressed with
+    Content-Encoding: gzip. Samples are stored in per-minute bucket documents,
+    and the stable weight is linked to the transaction when txid is given.
+
+    Args:
+        WeightTelemetryBatch: kid, session_id, samples [[timestamp_ms, grams], ...], optional txid and stable_weight
+
+    Returns:
+        WeightTelemetryResponse: Number of samples accepted and buckets written
+
+    Raises:
+        TelemetryInvalidPayloadException: 400 if the body cannot be decoded or is too large
+        RateLimitedException: 429 if the client sends requests too fast
+        TelemetryRateLimitedException: 429 if the kiosk sends batches too fast
+        PaymentNotFoundException: 404 if txid is given but not found
+        TelemetryException: 500 for database errors
+    """
+    # 1. Decode and validate the batch
+    try:
+        batch = WeightTelemetryBatch.model_validate_json(await _read_body(request))
+    except ValidationError as e:
+        raise TelemetryInvalidPayloadException(str(e)) from e
+
+    if len(batch.samples) > MAX_SAMPLES_PER_BATCH:
+        raise TelemetryInvalidPayloadException(
+            f"more than {MAX_SAMPLES_PER_BATCH} samples in one batch"
+        )
+
+    # 2. Rate limit per kiosk
+    retry_after = await run_in_threadpool(telemetry_limiter().acquire, batch.kid)
+    if retry_after:
+        raise TelemetryRateLimitedException(batch.kid, retry_after)
+
+    # 3. Store samples in per-minute buckets
+    buckets = await run_in_threadpool(
+        firebase_service.store_weight_samples,
+        batch.kid,
+        batch.session_id,
+        batch.samples,
+        txid=batch.txid,
+        stable_weight=batch.stable_weight,
+    )
+
+    return WeightTelemetryResponse(accepted=len(batch.samples), buckets=buckets)
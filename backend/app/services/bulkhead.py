@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+from app.exceptions import ServiceOverloadedException
+from app.services.metrics import metrics
+
+
+class Bulkhead:
+    """
+    Bounded concurrency for one dependency (Firestore, S3).
+
+    At most `limit` calls run at once; a caller waits at most `max_wait`
+    seconds for a slot and otherwise gets a 503 (ServiceOverloadedException)
+    instead of queueing behind every other in-flight request. Slots are
+    re-entrant per thread, so a service method that calls another service
+    method holds a single slot.
+    """
+
+    def __init__(self, name: str, limit: int, max_wait: float):
+        self.name = name
+        self.limit = limit
+        self.max_wait = max_wait
+        self.semaphore = threading.BoundedSemaphore(limit)
+        self.local = threading.local()
+
+    @contextmanager
+    def slot(self):
+        depth = getattr(self.local, "depth", 0)
+        if depth:
+            self.local.depth = depth + 1
+            try:
+                yield
+            finally:
+                self.local.depth = depth
+            return
+
+        start = time.perf_counter()
+        acquired = self.semaphore.acquire(timeout=self.max_wait)
+        metrics.dependency_wait.observe(time.perf_counter() - start, self.name)
+        if not acquired:
+            metrics.dependency_rejections.inc(self.name)
+            raise ServiceOverloadedException(self.name, retry_after=1)
+
+        self.local.depth = 1
+        try:
+            yield
+        finally:
+            self.local.depth = 0
+            self.semaphore.release()
+
+
+def bulkhead_from_env(name: str, default_limit: int, default_wait_ms: int) -> Bulkhead:
+    """Create a bulkhead configured by <NAME>_MAX_CONCURRENCY and <NAME>_MAX_WAIT_MS"""
+    prefix = name.upper()
+    return Bulkhead(
+        name,
+        limit=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", default_limit)),
+        max_wait=int(os.getenv(f"{prefix}_MAX_WAIT_MS", default_wait_ms)) / 1000,
+    )
+
+
+# Firestore calls share the gRPC channel; S3 calls share boto3's pool (10 connections).
+# Built on first use so settings from .env are already loaded.
+@lru_cache(maxsize=None)
+def firestore_bulkhead() -> Bulkhead:
+    return bulkhead_from_env("firestore", 32, 1000)
+
+
+@lru_cache(maxsize=None)
+def s3_bulkhead() -> Bulkhead:
+    return bulkhead_from_env("s3", 10, 1000)
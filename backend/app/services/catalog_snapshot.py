@@ -0,0 +1,110 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Collections mirrored in memory for catalog reads
+SNAPSHOT_COLLECTIONS = ("products", "kiosks", "kiosk_catalogs")
+
+
+class CollectionSnapshot:
+    """
+    In-memory copy of one collection, kept current by an on_snapshot listener.
+
+    The listener delivers the full document list after every change, and the
+    copy is replaced in one assignment, so readers never see a partial update.
+    Firestore only calls back when something changes, so the copy is current
+    while the listener is active and in sync; after an error, or while a
+    reconnected stream is being reset, it is as old as its last read_time.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.documents: Dict[str, dict] = {}
+        self.watch = None
+        self.ready = False
+        self.read_time: Optional[datetime] = None  # server time of the copy
+        self.started_at = time.time()
+        self.lock = threading.Lock()
+
+    @property
+    def live(self) -> bool:
+        return self.ready and self.watch is not None and self.watch.is_active
+
+    @property
+    def in_sync(self) -> bool:
+        # Firestore's Watch clears `current` on a RESET (e.g. after a
+        # reconnect) until the server has resent the target
+        return self.live and getattr(self.watch, "current", True)
+
+    def on_snapshot(self, docs, changes, read_time) -> None:
+        documents = {doc.id: doc.to_dict() for doc in docs}
+        with self.lock:
+            self.documents = documents
+            self.read_time = read_time
+            self.ready = True
+
+    def staleness(self) -> float:
+        """Seconds the copy may be behind Firestore (0 while in sync)"""
+        if self.in_sync:
+            return 0.0
+        if self.read_time is None:
+            return time.time() - self.started_at
+        return max(0.0, time.time() - self.read_time.timestamp())
+
+
+class CatalogSnapshot:
+    """
+    Local materialized view of the catalog collections.
+
+    Started from the app's startup event; FirebaseService reads from it while
+    its listener is live and falls back to Firestore otherwise. Writes still
+    go to Firestore and show up here once the listener delivers them.
+    Set CATALOG_SNAPSHOT=0 to disable.
+    """
+
+    def __init__(self):
+        self.collections = {
+            name: CollectionSnapshot(name) for name in SNAPSHOT_COLLECTIONS
+        }
+        for name, snapshot in self.collections.items():
+            metrics.snapshot_staleness.set_function(snapshot.staleness, name)
+            metrics.snapshot_documents.set_function(
+                lambda s=snapshot: len(s.documents), name
+            )
+
+    @property
+    def enabled(self) -> bool:
+        return os.getenv("CATALOG_SNAPSHOT", "1").strip().lower() not in ("0", "false")
+
+    def start(self, db) -> None:
+        """Attach an on_snapshot listener to each collection"""
+        if not getattr(db, "supports_watch", True):
+            logger.info("Catalog snapshot disabled: store has no on_snapshot")
+            return
+        for name, snapshot in self.collections.items():
+            try:
+                snapshot.watch = db.collection(name).on_snapshot(snapshot.on_snapshot)
+            except Exception as e:
+                logger.warning("Catalog snapshot of %s not started: %s", name, e)
+
+    def stop(self) -> None:
+        for snapshot in self.collections.values():
+            if snapshot.watch is not None:
+                snapshot.watch.unsubscribe()
+                snapshot.watch = None
+
+    def serving(self, name: str) -> Optional[Dict[str, dict]]:
+        """The collection's documents {id: data} if its listener is live, else None"""
+        snapshot = self.collections[name]
+        return snapshot.documents if snapshot.live else None
+
+
+# create a singleton instance
+catalog_snapshot = CatalogSnapshot()
@@ -1,10 +1,13 @@
+import copy
 import json
+import logging
 import os
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import firebase_admin
 from firebase_admin import credentials, firestore
+from pydantic import BaseModel, ValidationError
 
 from app.exceptions import (
     FirebaseConnectionException,
@@ -18,14 +21,53 @@ from app.exceptions import (
     ProductDataCorruptedException,
     ProductException,
     ProductNotFoundException,
+    TelemetryException,
 )
-from app.models import Kiosk, Payment, Product
+from app.models import Kiosk, KioskOut, Payment, Product, TransactionOut
+from app.services.local_store import open_document_store
+from app.services.bulkhead import firestore_bulkhead
+from app.services.catalog_snapshot import catalog_snapshot
+from app.services.metrics import instrumented
+from app.services.resilience import hedged, resilient
 from app.services.s3 import s3_service
+from app.services.transaction_queue import transaction_queue
+
+logger = logging.getLogger(__name__)
 
 # Korea Standard Time (UTC+9)
 KST = timezone(timedelta(hours=9))
 
-
+# Samples per weight_telemetry document (about 40 bytes each), well under
+# Firestore's 1 MiB document limit
+MAX_SAMPLES_PER_BUCKET = 10000
+
+
+def _validate_or_skip(model: type[BaseModel], data: Dict[str, Any], doc_id: str):
+    """Validate one listed document; a corrupted one is logged and skipped (None)"""
+    try:
+        return model.model_validate(data)
+    except ValidationError as e:
+        logger.warning(
+            "%sDataCorrupted: skipping %s in list: %s",
+            model.__name__.removesuffix("Out"),
+            doc_id,
+            e,
+        )
+        return None
+
+
+@resilient(
+    "firebase",
+    fallback=(
+        "get_kiosk_by_id",
+        "get_all_kiosks",
+        # raw documents, so presigned URLs are always generated fresh
+        "_product_document",
+        "_product_documents",
+        "_read_kiosk_catalog",
+    ),
+)
+@instrumented("firebase", bulkhead=firestore_bulkhead)
 class FirebaseService:
     """Firebase service for database operations"""
 
@@ -33,14 +75,26 @@ class FirebaseService:
         self.db = None
 
     def initialize(self):
-        """Initialize Firebase Admin SDK"""
+        """Initialize Firebase Admin SDK (or a local store, see STORAGE_BACKEND)"""
+        # Use a local document store instead of Firestore if configured
+        backend = os.getenv("STORAGE_BACKEND", "firestore").strip().lower()
+        if backend != "firestore":
+            try:
+                self.db = open_document_store(backend)
+                logger.info("Using local %s store instead of Firestore", backend)
+                return
+            except Exception as e:
+                raise FirebaseInitializationException(
+                    f"Failed to open local {backend} store: {str(e)}"
+                ) from e
+
         try:
             # Check if already initialized
             if not firebase_admin._apps:
                 # Try to get credentials from file path first
                 cred_path = os.getenv("FIREBASE_CREDENTIALS_PATH")
                 if cred_path:
-                    print("use credentials path")
+                    logger.debug("use credentials path")
                     try:
                         cred = credentials.Certificate(cred_path)
                         firebase_admin.initialize_app(cred)
@@ -54,7 +108,7 @@ class FirebaseService:
                         ) from e
                 else:
                     # Fall back to credentials JSON string
-                    print("use credentials json")
+                    logger.debug("use credentials json")
                     firebase_json = os.environ.get("FIREBASE_CREDENTIALS_JSON")
                     if firebase_json:
                         try:
@@ -82,7 +136,7 @@ class FirebaseService:
 
                 try:
                     self.db = firestore.client()
-                    print("Firebase initialized successfully")
+                    logger.debug("Firebase initialized successfully")
                 except Exception as e:
                     raise FirebaseConnectionException(
                         f"Failed to connect to Firestore: {str(e)}"
@@ -90,7 +144,7 @@ class FirebaseService:
             else:
                 try:
                     self.db = firestore.client()
-                    print("Using existing Firebase app")
+                    logger.debug("Using existing Firebase app")
                 except Exception as e:
                     raise FirebaseConnectionException(
                         f"Failed to get Firestore client: {str(e)}"
@@ -100,7 +154,7 @@ class FirebaseService:
             # Re-raise our custom exceptions
             raise
         except Exception as e:
-            print(f"Error initializing Firebase: {e}")
+            logger.exception("Error initializing Firebase: %s", e)
             raise FirebaseInitializationException(
                 f"Unexpected initialization error: {str(e)}"
             ) from e
@@ -122,7 +176,7 @@ class FirebaseService:
                 counter_ref.set({"value": 1})
                 return 1
         except Exception as e:
-            print(f"Error getting counter {counter_name}: {e}")
+            logger.error("Error getting counter %s: %s", counter_name, e)
             raise
 
     # Kiosk operation ---------------------------------------------------------
@@ -136,9 +190,10 @@ class FirebaseService:
 
         kiosk_id = f"kiosk_{counter:03d}"
 
-        # 2. Add timestamps
+        # 2. Add timestamps and the flat product_ids index
         kiosk_data["created_at"] = datetime.now(KST)
         kiosk_data["updated_at"] = datetime.now(KST)
+        kiosk_data["product_ids"] = self._product_ids(kiosk_data.get("products", []))
 
         # 3. Reference Firestore document
         doc_ref = self.db.collection("kiosks").document(kiosk_id)
@@ -164,13 +219,24 @@ class FirebaseService:
 
         return kiosk_id
 
-    def get_kiosk_by_id(self, kid: str) -> Kiosk:
-        """Get a specific kiosk by kid"""
+    def get_kiosk_by_id(self, kid: str, consistent: bool = False) -> Kiosk:
+        """
+        Get a specific kiosk by kid
+
+        Served from the catalog snapshot when it is live, unless `consistent`
+        is set (read-modify-write callers must read Firestore itself).
+        """
+        kiosks = None if consistent else catalog_snapshot.serving("kiosks")
+        if kiosks is not None:
+            if kid not in kiosks:
+                raise KioskNotFoundException(kid=kid)
+            return Kiosk(kid=kid, **copy.deepcopy(kiosks[kid]))
+
         # 1. Get document reference and fetch
         doc_ref = self.db.collection("kiosks").document(kid)
 
         try:
-            doc = doc_ref.get()
+            doc = hedged(doc_ref.get, "get_kiosk_by_id")
         except Exception as e:
             raise KioskException(f"Failed to get kiosk {kid}: {str(e)}") from e
 
@@ -196,8 +262,10 @@ class FirebaseService:
         if not doc.exists:
             raise KioskNotFoundException(kid=kid)
 
-        # 3. Add updated timestamp
+        # 3. Add updated timestamp (and product_ids if assignments changed)
         kiosk_data["updated_at"] = datetime.now(KST)
+        if "products" in kiosk_data:
+            kiosk_data["product_ids"] = self._product_ids(kiosk_data["products"])
 
         # 4. Update kiosk
         try:
@@ -205,6 +273,33 @@ class FirebaseService:
         except Exception as e:
             raise KioskException(f"Failed to update kiosk {kid}: {str(e)}") from e
 
+        # 5. Rebuild the kiosk catalog if product assignments changed. The
+        # update is already applied, so a failed rebuild is logged, not raised;
+        # the next rebuild of this kiosk brings the catalog up to date.
+        if "products" in kiosk_data:
+            try:
+                self.rebuild_kiosk_catalog(kid)
+            except Exception as e:
+                logger.error(
+                    "Catalog rebuild after updating kiosk %s failed: %s", kid, e
+                )
+
+    @staticmethod
+    def _product_ids(products: List[Any]) -> List[str]:
+        """Flat list of assigned pids, queried with array_contains"""
+        return [p["pid"] for p in products if isinstance(p, dict) and p.get("pid")]
+
+    def backfill_kiosk_product_ids(self) -> int:
+        """Add product_ids to kiosks written before it existed. Returns the count."""
+        updated = 0
+        for doc in self.db.collection("kiosks").stream():
+            data = doc.to_dict()
+            product_ids = self._product_ids(data.get("products", []))
+            if data.get("product_ids") != product_ids:
+                doc.reference.update({"product_ids": product_ids})
+                updated += 1
+        return updated
+
     def delete_kiosk(self, kid: str) -> None:
         """Delete a kiosk by ID"""
         # 1. Get document reference
@@ -225,8 +320,25 @@ class FirebaseService:
         except Exception as e:
             raise KioskException(f"Failed to delete kiosk {kid}: {str(e)}") from e
 
-    def get_all_kiosks(self) -> List[Dict[str, Any]]:
-        """Get all kiosks from Firebase"""
+        # 4. Retire its catalog (kept so versions stay monotonic); reads of a
+        # deleted kiosk 404 either way, so a failure is only logged
+        try:
+            self._write_kiosk_catalog(kid, retire=True)
+        except Exception as e:
+            logger.error("Retiring catalog of deleted kiosk %s failed: %s", kid, e)
+
+    def get_all_kiosks(self) -> List[KioskOut]:
+        """Get all kiosks from Firebase (or the catalog snapshot when live)"""
+        snapshot = catalog_snapshot.serving("kiosks")
+        if snapshot is not None:
+            kiosks = (
+                _validate_or_skip(
+                    KioskOut, {**copy.deepcopy(data), "kiosk_id": kid}, kid
+                )
+                for kid, data in snapshot.items()
+            )
+            return [kiosk for kiosk in kiosks if kiosk is not None]
+
         try:
             kiosks_ref = self.db.collection("kiosks")
             docs = kiosks_ref.stream()
@@ -235,7 +347,9 @@ class FirebaseService:
             for doc in docs:
                 kiosk_data = doc.to_dict()
                 kiosk_data["kiosk_id"] = doc.id
-                kiosks.append(kiosk_data)
+                kiosk = _validate_or_skip(KioskOut, kiosk_data, doc.id)
+                if kiosk is not None:
+                    kiosks.append(kiosk)
 
             return kiosks
         except Exception as e:
@@ -270,39 +384,55 @@ class FirebaseService:
         return product_id
 
     def get_all_products(self) -> List[Product]:
-        """Get all products from Firebase with presigned URLs"""
+        """Get all products from Firebase (or the catalog snapshot) with presigned URLs"""
+        products = []
+        for data in self._product_documents():
+            try:
+                products.append(self._build_product(dict(data)))
+            except Exception as e:
+                raise ProductDataCorruptedException(
+                    pid=data["pid"], reason=str(e)
+                ) from e
+
+        return products
+
+    def _product_documents(self) -> List[Dict[str, Any]]:
+        """Stored data (including pid) of all products, before presigning"""
+        snapshot = catalog_snapshot.serving("products")
+        if snapshot is not None:
+            return [{**data, "pid": pid} for pid, data in snapshot.items()]
+
         try:
             products_ref = self.db.collection("products")
             docs = products_ref.stream()
 
-            products = []
-            for doc in docs:
-                product_data = doc.to_dict()
-                try:
-                    product = Product(**product_data, pid=doc.id)
-                    # Convert S3 key to presigned URL
-                    product.image_url = s3_service.convert_to_presigned_url(
-                        product.image_url
-                    )
-                    products.append(product)
-                except Exception as e:
-                    raise ProductDataCorruptedException(
-                        pid=doc.id, reason=str(e)
-                    ) from e
-
-            return products
-        except ProductDataCorruptedException:
-            raise
+            return [{**doc.to_dict(), "pid": doc.id} for doc in docs]
         except Exception as e:
             raise ProductException(f"Failed to get all products: {str(e)}") from e
 
     def get_product_by_id(self, pid: str) -> Product:
         """Get a specific product by ID with presigned URL"""
+        data = self._product_document(pid)
+
+        # Convert to Product model
+        try:
+            return self._build_product(dict(data))
+        except Exception as e:
+            raise ProductDataCorruptedException(pid=pid, reason=str(e)) from e
+
+    def _product_document(self, pid: str) -> Dict[str, Any]:
+        """Stored data (including pid) of one product, before presigning"""
+        snapshot = catalog_snapshot.serving("products")
+        if snapshot is not None:
+            if pid not in snapshot:
+                raise ProductNotFoundException(pid=pid)
+            return {**snapshot[pid], "pid": pid}
+
         # 1. Get document reference and fetch
         doc_ref = self.db.collection("products").document(pid)
 
         try:
-            doc = doc_ref.get()
+            doc = hedged(doc_ref.get, "get_product_by_id")
         except Exception as e:
             raise ProductException(f"Failed to get product {pid}: {str(e)}") from e
 
@@ -310,15 +440,18 @@ class FirebaseService:
         if not doc.exists:
             raise ProductNotFoundException(pid=pid)
 
-        # 3. Convert to Product model
-        data = doc.to_dict()
-        try:
-            product = Product(**data, pid=doc.id)
-            # Convert S3 key to presigned URL
-            product.image_url = s3_service.convert_to_presigned_url(product.image_url)
-            return product
-        except Exception as e:
-            raise ProductDataCorruptedException(pid=pid, reason=str(e)) from e
+        return {**doc.to_dict(), "pid": pid}
+
+    @staticmethod
+    def _build_product(data: Dict[str, Any]) -> Product:
+        """Build a Product from stored data (including pid) with the presigned URL"""
+        # Convert S3 key to presigned URL
+        data["image_url"] = s3_service.convert_to_presigned_url(
+            data.get("image_url")
+        )
+        if data["image_url"] is None:
+            data.pop("image_url")
+        return Product.model_validate(data)
 
     def update_product(self, product_id: str, product_data: Dict[str, Any]) -> None:
         """Update an existing product"""
@@ -344,6 +477,15 @@ class FirebaseService:
                 f"Failed to update product {product_id}: {str(e)}"
             ) from e
 
+        # 4. Rebuild catalogs of kiosks carrying this product (the update is
+        # already applied, so a failed rebuild is logged, not raised)
+        try:
+            self.rebuild_catalogs_for_product(product_id)
+        except Exception as e:
+            logger.error(
+                "Catalog rebuild after updating product %s failed: %s", product_id, e
+            )
+
     def delete_product(self, product_id: str) -> None:
         """Delete a product by ID"""
         # 1. Get document reference
@@ -368,6 +510,15 @@ class FirebaseService:
                 f"Failed to delete product {product_id}: {str(e)}"
             ) from e
 
+        # 4. Rebuild catalogs of kiosks carrying this product (the delete is
+        # already applied, so a failed rebuild is logged, not raised)
+        try:
+            self.rebuild_catalogs_for_product(product_id)
+        except Exception as e:
+            logger.error(
+                "Catalog rebuild after deleting product %s failed: %s", product_id, e
+            )
+
     def upload_product_image(
         self, pid: str, file_obj, filename: str, content_type: str
     ) -> str:
@@ -402,6 +553,255 @@ class FirebaseService:
         # 3. Generate presigned URL
         return s3_service.generate_presigned_url(image_key, expires_in)
 
+    # Kiosk catalog operations -------------------------------------------------
+    def rebuild_kiosk_catalog(self, kid: str) -> Dict[str, Any]:
+        """
+        Rebuild the denormalized kiosk_catalogs/{kid} document.
+
+        The catalog stores each assigned product's data (with the raw S3 key as
+        image_url) and its kiosk availability, so the kiosk can boot with a
+        single document read. Products that no longer exist are skipped.
+
+        Every rebuild bumps the catalog's monotonic version. Entries keep the
+        version at which they last changed, and removed products are kept as
+        tombstones ({pid: version}) so kiosks can sync deltas. Tombstones older
+        than CATALOG_TOMBSTONE_TTL_DAYS (default 30) are pruned; kiosks that
+        last synced before a pruned tombstone get a full snapshot instead.
+        """
+        try:
+            return self._write_kiosk_catalog(kid)
+        except KioskNotFoundException:
+            raise
+        except Exception as e:
+            raise KioskException(
+                f"Failed to rebuild kiosk catalog {kid}: {str(e)}"
+            ) from e
+
+    def _write_kiosk_catalog(self, kid: str, retire: bool = False) -> Dict[str, Any]:
+        """
+        Read, bump and write the catalog in one transaction, so concurrent
+        rebuilds cannot both write the same version with different contents.
+        With `retire` (kiosk deleted) the catalog is emptied and marked deleted
+        but kept, so a recreated kiosk continues from its version.
+        """
+        kiosk_ref = self.db.collection("kiosks").document(kid)
+        catalog_ref = self.db.collection("kiosk_catalogs").document(kid)
+        ttl = timedelta(days=float(os.getenv("CATALOG_TOMBSTONE_TTL_DAYS", 30)))
+
+        @firestore.transactional
+        def write(transaction):
+            # 1. Get kiosk product assignments and the previous catalog
+            snapshots = {
+                doc.reference.path: doc
+                for doc in transaction.get_all([kiosk_ref, catalog_ref])
+            }
+            kiosk_doc = snapshots[kiosk_ref.path]
+            backfill = None  # product_ids for kiosks written before it existed
+            if retire:
+                assignments = []
+            elif not kiosk_doc.exists:
+                raise KioskNotFoundException(kid=kid)
+            else:
+                kiosk_data = kiosk_doc.to_dict()
+                assignments = [
+                    p
+                    for p in kiosk_data.get("products", [])
+                    if isinstance(p, dict) and p.get("pid")
+                ]
+                product_ids = [p["pid"] for p in assignments]
+                if kiosk_data.get("product_ids") != product_ids:
+                    backfill = product_ids
+
+            previous_doc = snapshots[catalog_ref.path]
+            previous = previous_doc.to_dict() if previous_doc.exists else {}
+            previous_items = {
+                item["product"]["pid"]: item for item in previous.get("products", [])
+            }
+            version = previous.get("version", 0) + 1
+            now = datetime.now(KST)
+
+            # 2. Fetch all assigned products in one batch
+            product_refs = {
+                p["pid"]: self.db.collection("products").document(p["pid"])
+                for p in assignments
+            }
+            products = (
+                {
+                    doc.reference.path: doc
+                    for doc in transaction.get_all(list(product_refs.values()))
+                }
+                if product_refs
+                else {}
+            )
+
+            # 3. Build catalog entries in kiosk order
+            items = []
+            for kiosk_prod in assignments:
+                pid = kiosk_prod["pid"]
+                doc = products.get(product_refs[pid].path)
+                if doc is None or not doc.exists:
+                    continue
+                product_data = doc.to_dict()
+                product_data["pid"] = pid
+                item = {
+                    "product": product_data,
+                    "available": kiosk_prod.get("available", False),
+                }
+
+                # Keep the previous version if nothing changed for this entry
+                old = previous_items.get(pid)
+                if (
+                    old
+                    and old["product"] == item["product"]
+                    and old["available"] == item["available"]
+                ):
+                    item["version"] = old.get("version", version)
+                else:
+                    item["version"] = version
+                items.append(item)
+
+            # 4. Record tombstones for removed products and prune old ones
+            tombstones = dict(previous.get("removed", {}))
+            removed_at = dict(previous.get("removed_at", {}))
+            current_pids = {item["product"]["pid"] for item in items}
+            for pid in current_pids:
+                tombstones.pop(pid, None)
+                removed_at.pop(pid, None)
+            for pid in previous_items:
+                if pid not in current_pids:
+                    tombstones[pid] = version
+                    removed_at[pid] = now
+
+            pruned_through = previous.get("pruned_through", 0)
+            for pid in list(tombstones):
+                if removed_at.setdefault(pid, now) < now - ttl:
+                    pruned_through = max(pruned_through, tombstones.pop(pid))
+                    del removed_at[pid]
+
+            catalog = {
+                "kid": kid,
+                "version": version,
+                "products": items,
+                "removed": tombstones,
+                "removed_at": removed_at,
+                "pruned_through": pruned_through,
+                "deleted": retire,
+                "updated_at": now,
+            }
+
+            # 5. Save catalog (writes must follow every read in a transaction)
+            transaction.set(catalog_ref, catalog)
+            if backfill is not None:
+                transaction.update(kiosk_ref, {"product_ids": backfill})
+            return catalog
+
+        return write(self.db.transaction())
+
+    def rebuild_catalogs_for_product(self, pid: str) -> None:
+        """
+        Rebuild the catalogs of every kiosk that carries the given product.
+        A failed kiosk is logged and skipped so the others are still rebuilt.
+        """
+        try:
+            docs = (
+                self.db.collection("kiosks")
+                .where("product_ids", "array_contains", pid)
+                .stream()
+            )
+            kiosk_ids = [doc.id for doc in docs]
+        except Exception as e:
+            raise ProductException(
+                f"Failed to find kiosks carrying product {pid}: {str(e)}"
+            ) from e
+
+        for kid in kiosk_ids:
+            try:
+                self.rebuild_kiosk_catalog(kid)
+            except Exception as e:
+                logger.error("Catalog rebuild of kiosk %s failed: %s", kid, e)
+
+    def _read_kiosk_catalog(self, kid: str) -> Dict[str, Any]:
+        """Read the catalog document, building it on first access"""
+        snapshot = catalog_snapshot.serving("kiosk_catalogs")
+        if (
+            snapshot is not None
+            and kid in snapshot
+            and not snapshot[kid].get("deleted")
+        ):
+            return snapshot[kid]
+
+        try:
+            doc = self.db.collection("kiosk_catalogs").document(kid).get()
+        except Exception as e:
+            raise KioskException(
+                f"Failed to get kiosk catalog {kid}: {str(e)}"
+            ) from e
+
+        catalog = doc.to_dict() if doc.exists else None
+        if catalog is None or catalog.get("deleted"):
+            return self.rebuild_kiosk_catalog(kid)  # 404 if the kiosk is gone
+        return catalog
+
+    def _catalog_items(
+        self, catalog_products: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Convert catalog entries to {"product": Product, "available": bool}"""
+        items = []
+        for item in catalog_products:
+            product_data = item["product"]
+            try:
+                product = self._build_product(dict(product_data))
+            except Exception as e:
+                raise ProductDataCorruptedException(
+                    pid=product_data.get("pid", ""), reason=str(e)
+                ) from e
+            items.append({"product": product, "available": item["available"]})
+
+        return items
+
+    def get_kiosk_catalog(self, kid: str) -> List[Dict[str, Any]]:
+        """
+        Get the kiosk's products with full details from its catalog document.
+
+        Builds the catalog on first access for kiosks created before catalogs
+        existed. Image keys are converted to presigned URLs on read, since
+        presigned URLs expire and cannot be stored.
+        """
+        catalog = self._read_kiosk_catalog(kid)
+        return self._catalog_items(catalog.get("products", []))
+
+    def get_kiosk_sync(self, kid: str, since: int = 0) -> Dict[str, Any]:
+        """
+        Get catalog changes for a kiosk since the given catalog version.
+
+        Returns the changed products (data or availability) and the pids removed
+        after `since`. A full snapshot is returned when `since` is 0 or ahead of
+        the current version (e.g. the catalog was reset).
+        """
+        catalog = self._read_kiosk_catalog(kid)
+        version = catalog.get("version", 0)
+        # tombstones up to pruned_through are gone, so older kiosks resync fully
+        full = since <= 0 or since > version or since < catalog.get("pruned_through", 0)
+
+        changed = [
+            item
+            for item in catalog.get("products", [])
+            if full or item.get("version", version) > since
+        ]
+        removed = (
+            []
+            if full
+            else [pid for pid, v in catalog.get("removed", {}).items() if v > since]
+        )
+
+        return {
+            "kid": kid,
+            "version": version,
+            "full": full,
+            "products": self._catalog_items(changed),
+            "removed": removed,
+        }
+
     # Transaction operations -------------------------------------------------
     def create_transaction(self, payment_data: Dict[str, Any]) -> str:
         """Create a new transaction/payment in Firebase with initial status ONGOING"""
@@ -424,9 +824,21 @@ class FirebaseService:
                 f"Failed to get Firestore document reference: {str(e)}"
             ) from e
 
-        # 3. Save transaction to Firebase
+        # 3. Queue for write-behind if enabled (txid is generated client-side)
+        if transaction_queue.enabled:
+            try:
+                transaction_queue.enqueue(doc_ref.id, payment_data)
+                logger.debug("Queued transaction %s", doc_ref.id)
+                return doc_ref.id  # txid
+            except Exception as e:
+                raise PaymentException(
+                    f"Failed to queue transaction {doc_ref.id}: {str(e)}"
+                ) from e
+
+        # 4. Save transaction to Firebase
         try:
             doc_ref.set(payment_data)
+            logger.debug("Created transaction %s", doc_ref.id)
             return doc_ref.id  # txid
         except Exception as e:
             raise PaymentException(
@@ -435,6 +847,18 @@ class FirebaseService:
 
     def update_transaction(self, txid: str, updates: Dict[str, Any]) -> None:
         """Update an existing transaction after approval or other events."""
+        # 0. Merge into the queued transaction if it has not been flushed yet
+        if transaction_queue.enabled:
+            try:
+                if transaction_queue.merge(
+                    txid, {**updates, "updated_at": datetime.now(KST)}
+                ):
+                    return
+            except Exception as e:
+                raise PaymentException(
+                    f"Failed to update queued transaction {txid}: {str(e)}"
+                ) from e
+
         # 1. Reference Firestore document
         try:
             doc_ref = self.db.collection("transactions").document(txid)
@@ -459,49 +883,94 @@ class FirebaseService:
         # 4. Update transaction in Firebase
         try:
             doc_ref.update(updates)
+            logger.debug("Updated transaction %s: %s", txid, sorted(updates))
         except Exception as e:
             raise PaymentException(
                 f"Failed to update transaction {txid} in Firebase: {str(e)}"
             ) from e
 
-    def get_all_transactions(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Get all transactions from Firebase"""
-        try:
-            transactions_ref = self.db.collection("transactions").order_by(
-                "created_at", direction=firestore.Query.DESCENDING
-            )
+    def query_transactions(
+        self,
+        filters: Optional[Dict[str, str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[TransactionOut]:
+        """
+        Get transactions, newest first, matching every equality filter
+        (kid, status, payment_method, manager, pid) and created within
+        [start, end]. Naive datetimes are taken as KST.
+
+        Each filter field has a (field ASC, created_at DESC) index in
+        firestore.indexes.json, which Firestore merges for any combination.
+        Matching transactions still in the write-behind queue are merged in.
+        """
+        filters = filters or {}
+        if start is not None and start.tzinfo is None:
+            start = start.replace(tzinfo=KST)
+        if end is not None and end.tzinfo is None:
+            end = end.replace(tzinfo=KST)
 
+        try:
+            query = self.db.collection("transactions")
+            for field, value in filters.items():
+                query = query.where(field, "==", value)
+            if start is not None:
+                query = query.where("created_at", ">=", start)
+            if end is not None:
+                query = query.where("created_at", "<=", end)
+            query = query.order_by("created_at", direction=firestore.Query.DESCENDING)
             if limit:
-                transactions_ref = transactions_ref.limit(limit)
-
-            docs = transactions_ref.stream()
+                query = query.limit(limit)
 
-            transactions = []
-            for doc in docs:
+            transactions = {}
+            for doc in query.stream():
                 transaction_data = doc.to_dict()
                 transaction_data["transaction_id"] = doc.id
-                transactions.append(transaction_data)
-
-            return transactions
+                transaction = _validate_or_skip(
+                    TransactionOut, transaction_data, doc.id
+                )
+                if transaction is not None:
+                    transactions[doc.id] = transaction
         except Exception as e:
-            raise PaymentException(f"Failed to get all transactions: {str(e)}") from e
+            raise PaymentException(f"Failed to query transactions: {str(e)}") from e
 
-    def get_transaction_by_id(self, txid: str) -> Optional[Payment]:
-        """Get a specific transaction/payment by txid and return as Payment model"""
+        if not transaction_queue.enabled:
+            return list(transactions.values())
+
+        # Queued rows are not in Firestore yet, or are newer than the flushed copy
         try:
-            doc_ref = self.db.collection("transactions").document(txid)
-            doc = doc_ref.get()
+            pending = transaction_queue.pending()
         except Exception as e:
             raise PaymentException(
-                f"Failed to access transaction {txid}: {str(e)}"
+                f"Failed to read queued transactions: {str(e)}"
             ) from e
 
-        if not doc.exists:
-            raise PaymentNotFoundException(txid)
+        for txid, data in pending:
+            transactions.pop(txid, None)
+            created_at = data.get("created_at")
+            if (
+                all(data.get(field) == value for field, value in filters.items())
+                and (start is None or created_at >= start)
+                and (end is None or created_at <= end)
+            ):
+                transaction = _validate_or_skip(
+                    TransactionOut, {**data, "transaction_id": txid}, txid
+                )
+                if transaction is not None:
+                    transactions[txid] = transaction
+
+        oldest = datetime.min.replace(tzinfo=KST)
+        merged = sorted(
+            transactions.values(), key=lambda t: t.created_at or oldest, reverse=True
+        )
+        return merged[:limit] if limit else merged
 
-        try:
-            data = doc.to_dict()
+    def get_transaction_by_id(self, txid: str) -> Optional[Payment]:
+        """Get a specific transaction/payment by txid and return as Payment model"""
+        data = self._transaction_data(txid)
 
+        try:
             # Firestore timestamp → datetime 처리 (optional)
             if "created_at" in data and hasattr(data["created_at"], "to_pydatetime"):
                 data["created_at"] = data["created_at"].to_pydatetime()
@@ -513,35 +982,140 @@ class FirebaseService:
                 data["approved_at"] = data["approved_at"].to_pydatetime()
 
             # txid는 doc.id로 덮어쓰기
-            return Payment(**data, txid=doc.id)
+            return Payment(**data, txid=txid)
 
         except Exception as e:
             raise PaymentException(
                 f"Failed to parse transaction {txid} data: {str(e)}"
             ) from e
 
-    def get_transactions_by_kiosk(self, kiosk_id: str) -> List[Dict[str, Any]]:
-        """Get all transactions for a specific kiosk"""
+    def get_transaction(self, txid: str) -> TransactionOut:
+        """Get a specific transaction in the same shape as query_transactions entries"""
+        data = self._transaction_data(txid)
+
         try:
-            transactions_ref = (
-                self.db.collection("transactions")
-                .where("kid", "==", kiosk_id)
-                .order_by("created_at", direction=firestore.Query.DESCENDING)
-            )
-            docs = transactions_ref.stream()
+            return TransactionOut.model_validate({**data, "transaction_id": txid})
+        except ValidationError as e:
+            raise PaymentException(
+                f"Failed to parse transaction {txid} data: {str(e)}"
+            ) from e
 
-            transactions = []
-            for doc in docs:
-                transaction_data = doc.to_dict()
-                transaction_data["transaction_id"] = doc.id
-                transactions.append(transaction_data)
+    def _transaction_data(self, txid: str) -> Dict[str, Any]:
+        """Stored data of a transaction, including one still in the queue"""
+        # Serve transactions that are still waiting in the write-behind queue
+        if transaction_queue.enabled:
+            try:
+                data = transaction_queue.get(txid)
+            except Exception as e:
+                raise PaymentException(
+                    f"Failed to access queued transaction {txid}: {str(e)}"
+                ) from e
+            if data is not None:
+                return data
 
-            return transactions
+        try:
+            doc_ref = self.db.collection("transactions").document(txid)
+            doc = doc_ref.get()
         except Exception as e:
             raise PaymentException(
-                f"Failed to get transactions for kiosk {kiosk_id}: {str(e)}"
+                f"Failed to access transaction {txid}: {str(e)}"
+            ) from e
+
+        if not doc.exists:
+            raise PaymentNotFoundException(txid)
+
+        return doc.to_dict()
+
+    # Telemetry operations -------------------------------------------------
+    def store_weight_samples(
+        self,
+        kid: str,
+        session_id: str,
+        samples: List[Tuple[int, float]],
+        txid: Optional[str] = None,
+        stable_weight: Optional[float] = None,
+    ) -> int:
+        """
+        Store weight samples in per-minute bucket documents.
+
+        Samples are grouped by minute into
+        weight_telemetry/{kid}_{session}_{YYYYMMDDHHMM} and appended with
+        ArrayUnion, so a batch costs one write per minute it spans instead of
+        one per sample (retransmitted samples are not duplicated within a
+        bucket). When txid and stable_weight are given, the stable weight is
+        recorded on the transaction as measured_grams.
+
+        A bucket holds at most MAX_SAMPLES_PER_BUCKET samples, well under
+        Firestore's 1 MiB document limit; further samples for that minute go
+        to shard documents {bucket}_1, {bucket}_2, ... The first bucket
+        document tracks the current shard and its sample count.
+
+        Returns the number of bucket documents written.
+        """
+        # 1. Group samples by minute
+        buckets: Dict[int, List[Dict[str, Any]]] = {}
+        for ts_ms, grams in samples:
+            buckets.setdefault(ts_ms // 60000, []).append({"t": ts_ms, "w": grams})
+
+        starts = {
+            minute: datetime.fromtimestamp(minute * 60, KST) for minute in buckets
+        }
+        collection = self.db.collection("weight_telemetry")
+        heads = {
+            minute: collection.document(f"{kid}_{session_id}_{start:%Y%m%d%H%M}")
+            for minute, start in starts.items()
+        }
+
+        try:
+            # 2. Read how full each minute's current shard is
+            fill = {}
+            if heads:
+                for doc in self.db.get_all(list(heads.values())):
+                    data = doc.to_dict() if doc.exists else {}
+                    fill[doc.id] = (data.get("shard", 0), data.get("shard_count", 0))
+
+            # 3. Append each minute's samples to its buckets in one batch
+            batch = self.db.batch()
+            written = 0
+            for minute, entries in buckets.items():
+                head = heads[minute]
+                shard, count = fill.get(head.id, (0, 0))
+                while entries:
+                    if count >= MAX_SAMPLES_PER_BUCKET:
+                        shard, count = shard + 1, 0
+                    room = MAX_SAMPLES_PER_BUCKET - count
+                    chunk, entries = entries[:room], entries[room:]
+                    doc_ref = head
+                    if shard:
+                        doc_ref = collection.document(f"{head.id}_{shard}")
+                    data = {
+                        "kid": kid,
+                        "session_id": session_id,
+                        "minute": starts[minute],
+                        "samples": firestore.ArrayUnion(chunk),
+                        "updated_at": datetime.now(KST),
+                    }
+                    if txid:
+                        data["txid"] = txid
+                    batch.set(doc_ref, data, merge=True)
+                    count += len(chunk)
+                    written += 1
+                batch.set(head, {"shard": shard, "shard_count": count}, merge=True)
+            if buckets:
+                batch.commit()
+        except Exception as e:
+            raise TelemetryException(
+                f"Failed to store weight samples for kiosk {kid}: {str(e)}"
             ) from e
 
+        # 4. Link the final stable weight to the transaction
+        if txid and stable_weight is not None:
+            self.update_transaction(
+                txid, {"measured_grams": stable_weight, "telemetry_session": session_id}
+            )
+
+        return written
+
 
 # create a singleton instance
 firebase_service = FirebaseService()
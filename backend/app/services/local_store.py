@@ -0,0 +1,476 @@
+"""
+Local document and blob stores standing in for Firestore and S3
+
+MemoryFirestore and SQLiteFirestore implement the subset of the Firestore
+client that FirebaseService uses (documents, simple queries, get_all, batches,
+transactions and the ArrayUnion/ArrayRemove/Increment transforms), so the service code runs
+unchanged against a local store with sub-millisecond reads. MemoryFirestore
+also supports collection on_snapshot listeners. LocalBlobClient
+implements the boto3 S3 calls used by S3Service on the local filesystem.
+
+Selected by environment:
+    STORAGE_BACKEND: "firestore" (default), "memory" or "sqlite"
+    LOCAL_STORE_PATH: SQLite database file (default local_store.db)
+    BLOB_STORE: "s3" (default) or "local"
+    LOCAL_BLOB_DIR, LOCAL_BLOB_BASE_URL: where local blobs are written and served
+"""
+
+import copy
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from firebase_admin import firestore
+from google.api_core.exceptions import NotFound
+from google.cloud.firestore_v1.watch import ChangeType, DocumentChange
+
+from app.services.serialization import decode_document, encode_document
+
+
+class DocumentSnapshot:
+    def __init__(self, reference: "DocumentReference", data: Optional[dict]):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self) -> Optional[dict]:
+        return copy.deepcopy(self._data)
+
+    def get(self, field: str) -> Any:
+        return (self._data or {}).get(field)
+
+
+class DocumentReference:
+    def __init__(self, client: "MemoryFirestore", collection: str, doc_id: str):
+        self._client = client
+        self.id = doc_id
+        self.path = f"{collection}/{doc_id}"
+        self._collection = collection
+
+    def get(self) -> DocumentSnapshot:
+        self._client._rpc()
+        return self._client._snapshot(self)
+
+    def set(self, data: dict, merge: bool = False) -> None:
+        self._client._rpc()
+        self._client._write(self, data, merge=merge)
+
+    def update(self, data: dict) -> None:
+        self._client._rpc()
+        self._client._write(self, data, merge=True, must_exist=True)
+
+    def delete(self) -> None:
+        self._client._rpc()
+        self._client._delete(self)
+
+
+class Query:
+    def __init__(self, client: "MemoryFirestore", collection: str):
+        self._client = client
+        self._collection = collection
+        self._filters: List[tuple] = []
+        self._order: List[tuple] = []
+        self._limit: Optional[int] = None
+
+    def _copy(self) -> "Query":
+        query = Query(self._client, self._collection)
+        query._filters = list(self._filters)
+        query._order = list(self._order)
+        query._limit = self._limit
+        return query
+
+    def where(self, field_path=None, op_string=None, value=None, *, filter=None):
+        if filter is not None:
+            field_path, op_string, value = (
+                filter.field_path,
+                filter.op_string,
+                filter.value,
+            )
+        query = self._copy()
+        query._filters.append((field_path, op_string, value))
+        return query
+
+    def order_by(self, field_path: str, direction: str = "ASCENDING") -> "Query":
+        query = self._copy()
+        query._order.append((field_path, direction))
+        return query
+
+    def limit(self, count: int) -> "Query":
+        query = self._copy()
+        query._limit = count
+        return query
+
+    def stream(self) -> Iterable[DocumentSnapshot]:
+        self._client._rpc()
+        return iter(self._client._query(self))
+
+    def get(self) -> List[DocumentSnapshot]:
+        return list(self.stream())
+
+
+class CollectionReference(Query):
+    def document(self, document_id: Optional[str] = None) -> DocumentReference:
+        return DocumentReference(
+            self._client, self._collection, document_id or uuid.uuid4().hex[:20]
+        )
+
+    def on_snapshot(self, callback) -> "Watch":
+        return self._client._watch(self._collection, callback)
+
+
+class Watch:
+    """Handle returned by on_snapshot"""
+
+    def __init__(self, client: "MemoryFirestore", collection: str, callback):
+        self._client = client
+        self._collection = collection
+        self._callback = callback
+        self.is_active = True
+
+    def unsubscribe(self) -> None:
+        with self._client._lock:
+            if self.is_active:
+                self._client._listeners[self._collection].remove(self)
+                self.is_active = False
+
+
+class WriteBatch:
+    def __init__(self, client: "MemoryFirestore"):
+        self._client = client
+        self._ops: List[tuple] = []
+
+    def set(self, reference, data, merge=False):
+        self._ops.append((reference, data, merge, False))
+
+    def update(self, reference, data):
+        self._ops.append((reference, data, True, True))
+
+    def delete(self, reference):
+        self._ops.append((reference, None, False, False))
+
+    def commit(self):
+        self._client._rpc()
+        with self._client._atomic():
+            self._apply_ops()
+
+    def _apply_ops(self) -> None:
+        for reference, data, merge, must_exist in self._ops:
+            if data is None:
+                self._client._delete(reference)
+            else:
+                self._client._write(reference, data, merge, must_exist)
+        self._ops = []
+
+
+class Transaction(WriteBatch):
+    """
+    Stand-in for a Firestore transaction, driven by firestore.transactional.
+
+    Pessimistic: the store's write lock is held from _begin to _commit or
+    _rollback, so transactions never conflict and are never retried.
+    """
+
+    _read_only = False
+    _max_attempts = 1
+
+    def __init__(self, client: "MemoryFirestore"):
+        super().__init__(client)
+        self._id: Optional[bytes] = None
+        self._context = None
+
+    def _clean_up(self) -> None:
+        self._ops = []
+        self._id = None
+
+    def _begin(self, retry_id: Optional[bytes] = None) -> None:
+        self._client._rpc()
+        self._context = self._client._atomic()
+        self._context.__enter__()
+        self._id = uuid.uuid4().bytes
+
+    def get_all(self, references) -> List[DocumentSnapshot]:
+        return [self._client._snapshot(ref) for ref in references]
+
+    def get(self, reference) -> Iterator[DocumentSnapshot]:
+        return iter(self.get_all([reference]))
+
+    def _commit(self) -> list:
+        context, self._context = self._context, None
+        try:
+            self._apply_ops()
+        except BaseException as e:
+            context.__exit__(type(e), e, e.__traceback__)
+            raise
+        context.__exit__(None, None, None)
+        self._clean_up()
+        return []
+
+    def _rollback(self) -> None:
+        context, self._context = self._context, None
+        self._clean_up()
+        if context is not None:
+            error = RuntimeError("transaction rolled back")
+            context.__exit__(RuntimeError, error, None)
+
+
+def _match(value: Any, op: str, expected: Any) -> bool:
+    if op == "==":
+        return value == expected
+    if op == "!=":
+        return value is not None and value != expected
+    if op == "in":
+        return value in expected
+    if op == "not-in":
+        return value is not None and value not in expected
+    if op == "array_contains":
+        return isinstance(value, list) and expected in value
+    if op == "array_contains_any":
+        return isinstance(value, list) and any(e in value for e in expected)
+    if value is None:
+        return False
+    try:
+        return {
+            "<": value < expected,
+            "<=": value <= expected,
+            ">": value > expected,
+            ">=": value >= expected,
+        }[op]
+    except TypeError:
+        return False
+
+
+class MemoryFirestore:
+    """Thread-safe in-memory Firestore client"""
+
+    # on_snapshot listeners see every write (checked by CatalogSnapshot.start)
+    supports_watch = True
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000
+        self.data: Dict[str, Dict[str, dict]] = {}
+        self._lock = threading.RLock()
+        self._listeners: Dict[str, List[Watch]] = {}
+        self.calls = 0
+
+    def _rpc(self) -> None:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def collection(self, name: str) -> CollectionReference:
+        return CollectionReference(self, name)
+
+    def batch(self) -> WriteBatch:
+        return WriteBatch(self)
+
+    def transaction(self) -> Transaction:
+        return Transaction(self)
+
+    def get_all(self, references) -> List[DocumentSnapshot]:
+        self._rpc()
+        return [self._snapshot(ref) for ref in references]
+
+    def _watch(self, collection: str, callback) -> Watch:
+        watch = Watch(self, collection, callback)
+        with self._lock:
+            self._listeners.setdefault(collection, []).append(watch)
+            self._notify(collection, [watch])
+        return watch
+
+    def _notify(self, collection: str, watches: List[Watch]) -> None:
+        """Send the full collection to listeners (every document as ADDED)"""
+        docs = self._query(Query(self, collection))
+        changes = [
+            DocumentChange(ChangeType.ADDED, doc, -1, index)
+            for index, doc in enumerate(docs)
+        ]
+        read_time = datetime.now(timezone.utc)
+        for watch in watches:
+            watch._callback(docs, changes, read_time)
+
+    # Storage primitives (overridden by SQLiteFirestore)
+    def _load(self, collection: str, doc_id: str) -> Optional[dict]:
+        return copy.deepcopy(self.data.get(collection, {}).get(doc_id))
+
+    def _store(self, collection: str, doc_id: str, data: dict) -> None:
+        self.data.setdefault(collection, {})[doc_id] = copy.deepcopy(data)
+
+    def _remove(self, collection: str, doc_id: str) -> None:
+        self.data.get(collection, {}).pop(doc_id, None)
+
+    def _scan(self, collection: str) -> Iterator[Tuple[str, dict]]:
+        for doc_id, data in self.data.get(collection, {}).items():
+            yield doc_id, copy.deepcopy(data)
+
+    @contextmanager
+    def _atomic(self):
+        with self._lock:
+            yield
+
+    def _snapshot(self, ref: DocumentReference) -> DocumentSnapshot:
+        with self._lock:
+            return DocumentSnapshot(ref, self._load(ref._collection, ref.id))
+
+    def _write(self, ref, data: dict, merge: bool, must_exist: bool = False) -> None:
+        with self._atomic():
+            current = self._load(ref._collection, ref.id)
+            if must_exist and current is None:
+                raise NotFound(f"No document to update: {ref.path}")
+            current = (current or {}) if merge else {}
+            for key, value in data.items():
+                current[key] = self._apply(current.get(key), value)
+            self._store(ref._collection, ref.id, current)
+            if self._listeners.get(ref._collection):
+                self._notify(ref._collection, self._listeners[ref._collection])
+
+    @staticmethod
+    def _apply(current: Any, value: Any) -> Any:
+        if isinstance(value, firestore.ArrayUnion):
+            items = list(current or [])
+            return items + [v for v in value.values if v not in items]
+        if isinstance(value, firestore.ArrayRemove):
+            return [v for v in current or [] if v not in value.values]
+        if isinstance(value, firestore.Increment):
+            return (current or 0) + value.value
+        return copy.deepcopy(value)
+
+    def _delete(self, ref) -> None:
+        with self._atomic():
+            self._remove(ref._collection, ref.id)
+            if self._listeners.get(ref._collection):
+                self._notify(ref._collection, self._listeners[ref._collection])
+
+    def _query(self, query: Query) -> List[DocumentSnapshot]:
+        collection = CollectionReference(self, query._collection)
+        with self._lock:
+            results = [
+                DocumentSnapshot(collection.document(doc_id), data)
+                for doc_id, data in self._scan(query._collection)
+                if all(_match(data.get(f), op, v) for f, op, v in query._filters)
+            ]
+        for field, direction in reversed(query._order):
+            results = [r for r in results if field in r._data]
+            results.sort(
+                key=lambda r: r._data[field],
+                reverse=direction == firestore.Query.DESCENDING,
+            )
+        if query._limit is not None:
+            results = results[: query._limit]
+        return results
+
+
+class SQLiteFirestore(MemoryFirestore):
+    """Firestore client stand-in persisted to a SQLite database (WAL mode)"""
+
+    # listeners would miss writes from other processes sharing the file
+    supports_watch = False
+
+    def __init__(self, path: str, latency_ms: float = 0.0):
+        super().__init__(latency_ms)
+        conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                collection TEXT NOT NULL,
+                id TEXT NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (collection, id)
+            )
+            """)
+        self.conn = conn
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _load(self, collection: str, doc_id: str) -> Optional[dict]:
+        row = self.conn.execute(
+            "SELECT data FROM documents WHERE collection = ? AND id = ?",
+            (collection, doc_id),
+        ).fetchone()
+        return decode_document(row[0]) if row else None
+
+    def _store(self, collection: str, doc_id: str, data: dict) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO documents (collection, id, data) VALUES (?, ?, ?)",
+            (collection, doc_id, encode_document(data)),
+        )
+
+    def _remove(self, collection: str, doc_id: str) -> None:
+        self.conn.execute(
+            "DELETE FROM documents WHERE collection = ? AND id = ?",
+            (collection, doc_id),
+        )
+
+    def _scan(self, collection: str) -> Iterator[Tuple[str, dict]]:
+        rows = self.conn.execute(
+            "SELECT id, data FROM documents WHERE collection = ?", (collection,)
+        ).fetchall()
+        for doc_id, raw in rows:
+            yield doc_id, decode_document(raw)
+
+    @contextmanager
+    def _atomic(self):
+        with self._lock:
+            if self.conn.in_transaction:
+                yield  # nested in a batch commit
+                return
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+
+class LocalBlobClient:
+    """boto3 S3 client stand-in that stores objects under a local directory"""
+
+    def __init__(self, root: str, base_url: str):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+
+    def _path(self, bucket: str, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, bucket, key))
+        if not path.startswith(os.path.abspath(self.root) + os.sep):
+            raise ValueError(f"Invalid object key: {key}")
+        return path
+
+    def upload_fileobj(self, Fileobj, Bucket, Key, ExtraArgs=None):
+        path = self._path(Bucket, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(Fileobj.read())
+
+    def generate_presigned_url(self, ClientMethod, Params, ExpiresIn=3600):
+        # Local blobs are served without signing
+        self._path(Params["Bucket"], Params["Key"])
+        return f"{self.base_url}/{Params['Bucket']}/{Params['Key']}"
+
+
+def open_document_store(backend: str) -> MemoryFirestore:
+    """Create the local document store named by STORAGE_BACKEND"""
+    if backend == "memory":
+        return MemoryFirestore()
+    if backend == "sqlite":
+        return SQLiteFirestore(os.getenv("LOCAL_STORE_PATH", "local_store.db"))
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def local_blob_dir() -> str:
+    return os.getenv("LOCAL_BLOB_DIR", "local_blobs")
+
+
+def open_local_blob_client() -> LocalBlobClient:
+    """Create the local blob client used when BLOB_STORE=local"""
+    return LocalBlobClient(
+        local_blob_dir(),
+        os.getenv("LOCAL_BLOB_BASE_URL", "http://localhost:8000/files"),
+    )
@@ -0,0 +1,241 @@
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional, Tuple
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Per-request timings {name: [count, total_seconds]}, set by the timing middleware
+request_timings: ContextVar[Optional[Dict[str, list]]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+class Histogram:
+    """Cumulative histogram in the Prometheus exposition format"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.series: Dict[Tuple[str, ...], list] = {}  # labels -> [buckets, sum, count]
+        self.lock = threading.Lock()
+
+    def observe(self, seconds: float, *labels: str) -> None:
+        index = bisect_left(BUCKETS, seconds)
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [[0] * len(BUCKETS), 0.0, 0]
+            if index < len(BUCKETS):
+                series[0][index] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self.lock:
+            items = [(k, list(v[0]), v[1], v[2]) for k, v in self.series.items()]
+        for labels, buckets, total, count in sorted(items):
+            label_str = ",".join(
+                f'{name}="{value}"' for name, value in zip(self.label_names, labels)
+            )
+            cumulative = 0
+            for bound, n in zip(BUCKETS, buckets):
+                cumulative += n
+                lines.append(
+                    f'{self.name}_bucket{{{label_str},le="{bound}"}} {cumulative}'
+                )
+            lines.append(f'{self.name}_bucket{{{label_str},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{label_str}}} {total:.6f}")
+            lines.append(f"{self.name}_count{{{label_str}}} {count}")
+        return "\n".join(lines)
+
+
+class Counter:
+    """Monotonic counter in the Prometheus exposition format"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.series: Dict[Tuple[str, ...], int] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *labels: str) -> None:
+        with self.lock:
+            self.series[labels] = self.series.get(labels, 0) + 1
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            items = sorted(self.series.items())
+        for labels, value in items:
+            label_str = ",".join(
+                f'{name}="{value}"' for name, value in zip(self.label_names, labels)
+            )
+            lines.append(f"{self.name}{{{label_str}}} {value}")
+        return "\n".join(lines)
+
+
+class Gauge:
+    """Gauge whose series are read from callbacks when rendered"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.series: Dict[Tuple[str, ...], Callable[[], float]] = {}
+        self.lock = threading.Lock()
+
+    def set_function(self, function: Callable[[], float], *labels: str) -> None:
+        with self.lock:
+            self.series[labels] = function
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        with self.lock:
+            items = sorted(self.series.items())
+        for labels, function in items:
+            label_str = ",".join(
+                f'{name}="{value}"' for name, value in zip(self.label_names, labels)
+            )
+            lines.append(f"{self.name}{{{label_str}}} {function():.3f}")
+        return "\n".join(lines)
+
+
+class Metrics:
+    """Process-wide request and service call metrics"""
+
+    def __init__(self):
+        self.http_requests = Histogram(
+            "http_request_duration_seconds",
+            "HTTP request latency by route",
+            ("method", "route", "status"),
+        )
+        self.service_calls = Histogram(
+            "service_call_duration_seconds",
+            "Firestore, S3 and QR code service call latency",
+            ("service", "operation"),
+        )
+        self.dependency_wait = Histogram(
+            "dependency_queue_wait_seconds",
+            "Time spent waiting for a Firestore/S3 concurrency slot",
+            ("dependency",),
+        )
+        self.dependency_rejections = Counter(
+            "dependency_rejections_total",
+            "Calls rejected with 503 because no slot freed up within the wait budget",
+            ("dependency",),
+        )
+        self.circuit_opened = Counter(
+            "circuit_breaker_opened_total",
+            "Times a circuit breaker opened",
+            ("operation",),
+        )
+        self.fallback_served = Counter(
+            "fallback_served_total",
+            "Cached results served because the dependency was failing",
+            ("operation",),
+        )
+        self.hedged_requests = Counter(
+            "hedged_requests_total",
+            "Reads re-sent because the first attempt exceeded the hedge delay",
+            ("operation",),
+        )
+        self.rate_limited = Counter(
+            "rate_limited_requests_total",
+            "Write requests rejected with 429 by the kiosk or client rate limit",
+            ("scope",),
+        )
+        self.snapshot_staleness = Gauge(
+            "catalog_snapshot_staleness_seconds",
+            "Age of the in-memory snapshot's last read_time while its listener "
+            "is down or resyncing (0 while in sync)",
+            ("collection",),
+        )
+        self.snapshot_documents = Gauge(
+            "catalog_snapshot_documents",
+            "Documents held in the in-memory snapshot",
+            ("collection",),
+        )
+
+    def record_call(self, service: str, operation: str, seconds: float) -> None:
+        """Record a service call in the histogram and the current request's timings"""
+        self.service_calls.observe(seconds, service, operation)
+        timings = request_timings.get()
+        if timings is not None:
+            entry = timings.setdefault(f"{service}.{operation}", [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def render(self) -> str:
+        collectors = [
+            self.http_requests,
+            self.service_calls,
+            self.dependency_wait,
+            self.dependency_rejections,
+            self.circuit_opened,
+            self.fallback_served,
+            self.hedged_requests,
+            self.rate_limited,
+            self.snapshot_staleness,
+            self.snapshot_documents,
+        ]
+        return "\n".join(c.render() for c in collectors) + "\n"
+
+
+def server_timing_header(timings: Dict[str, list], total: float) -> str:
+    """Format request timings as a Server-Timing header value"""
+    parts = [f"total;dur={total * 1000:.2f}"]
+    for name, (count, seconds) in timings.items():
+        part = f"{name};dur={seconds * 1000:.2f}"
+        if count > 1:
+            part += f';desc="{count} calls"'
+        parts.append(part)
+    return ", ".join(parts)
+
+
+def instrumented(service: str, bulkhead=None):
+    """
+    Class decorator that times every public method (including staticmethods)
+    and records it as service_call_duration_seconds{service, operation}.
+    With a bulkhead (a function returning the Bulkhead, so it can be built
+    lazily), every call also runs inside one of its concurrency slots.
+    """
+
+    def wrap(func, operation):
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                if bulkhead is None:
+                    return func(*args, **kwargs)
+                with bulkhead().slot():
+                    return func(*args, **kwargs)
+            finally:
+                metrics.record_call(service, operation, time.perf_counter() - start)
+
+        return timed
+
+    def decorate(cls):
+        for name, attr in list(vars(cls).items()):
+            if name.startswith("_"):
+                continue
+            if isinstance(attr, staticmethod):
+                setattr(cls, name, staticmethod(wrap(attr.__func__, name)))
+            elif callable(attr):
+                setattr(cls, name, wrap(attr, name))
+        return cls
+
+    return decorate
+
+
+# create a singleton instance
+metrics = Metrics()
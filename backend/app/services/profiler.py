@@ -0,0 +1,64 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler for a running worker.
+
+    A background thread snapshots every other thread's stack with
+    sys._current_frames() at a fixed interval and counts identical stacks.
+    The result is in the collapsed-stack format ("root;caller;callee count")
+    read by flamegraph.pl and speedscope. Only one profile runs at a time.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self.lock.locked()
+
+    def profile(self, seconds: float, interval: float = 0.005) -> Optional[str]:
+        """Sample for `seconds` and return collapsed stacks (None if already running)"""
+        if not self.lock.acquire(blocking=False):
+            return None
+        try:
+            return self._sample(seconds, interval)
+        finally:
+            self.lock.release()
+
+    @staticmethod
+    def _sample(seconds: float, interval: float) -> str:
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        stacks: Counter = Counter()
+        deadline = time.monotonic() + seconds
+
+        while time.monotonic() < deadline:
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.append(names.get(ident, f"thread-{ident}"))
+                stacks[";".join(reversed(labels))] += 1
+            time.sleep(interval)
+
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+# create a singleton instance
+sampling_profiler = SamplingProfiler()
@@ -4,6 +4,7 @@ from urllib.parse import quote
 import qrcode
 
 from app.exceptions import QRCodeGenerationException
+from app.services.metrics import instrumented
 
 KAKAO_UID = {
     "KIM": "FY0PfA6Rh",
@@ -30,6 +31,7 @@ TOSS_ACCOUNT = {
 }
 
 
+@instrumented("qrcode")
 class QRCodeService:
     """
     QR Code generation service for payment systems.
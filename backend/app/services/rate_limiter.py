@@ -0,0 +1,121 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+
+class TokenBucketLimiter:
+    """
+    In-process token bucket per key.
+
+    Each key holds up to `burst` tokens and refills at `rate` tokens per second.
+    acquire() returns 0 when the request may proceed, otherwise the number of
+    seconds until a token is available (for Retry-After).
+    """
+
+    def __init__(self, rate: float, burst: float, max_keys: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        # key -> (tokens, last), least recently used first
+        self._buckets: OrderedDict[str, Tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+
+            retry_after = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                retry_after = (cost - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+
+            # bounded memory: forget the least recently used keys
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return retry_after
+
+
+class SQLiteTokenBucketLimiter:
+    """
+    Token bucket per key kept in a SQLite file, shared by every worker process
+    on the host (serve.py runs several). Same interface as TokenBucketLimiter.
+    """
+
+    EVICT_EVERY = 1000  # acquires between sweeps of refilled buckets
+
+    def __init__(self, path: str, table: str, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.table = table
+        self._calls = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=5
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                last REAL NOT NULL
+            )
+            """)
+
+    def acquire(self, key: str, cost: float = 1.0) -> float:
+        with self._lock:
+            # wall clock, since the buckets are shared between processes
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    f"SELECT tokens, last FROM {self.table} WHERE key = ?", (key,)
+                ).fetchone()
+                tokens, last = row if row else (self.burst, now)
+                tokens = min(self.burst, tokens + max(0.0, now - last) * self.rate)
+
+                retry_after = 0.0
+                if tokens >= cost:
+                    tokens -= cost
+                else:
+                    retry_after = (cost - tokens) / self.rate
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, tokens, last) "
+                    "VALUES (?, ?, ?)",
+                    (key, tokens, now),
+                )
+
+                self._calls += 1
+                if self._calls % self.EVICT_EVERY == 0:
+                    self._conn.execute(
+                        f"DELETE FROM {self.table} WHERE last < ?",
+                        (now - self.burst / self.rate,),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return retry_after
+
+
+def limiter_from_env(name: str, default_rate: float, default_burst: float):
+    """
+    Build a limiter configured by <NAME>_RATE (tokens per second) and
+    <NAME>_BURST. RATE_LIMIT_STORE=sqlite shares the buckets between worker
+    processes through RATE_LIMIT_DB (default rate_limits.db); the default
+    "memory" keeps them per process.
+    """
+    prefix = name.upper()
+    rate = float(os.getenv(f"{prefix}_RATE", default_rate))
+    burst = float(os.getenv(f"{prefix}_BURST", default_burst))
+    if os.getenv("RATE_LIMIT_STORE", "memory").strip().lower() == "sqlite":
+        path = os.getenv("RATE_LIMIT_DB", "rate_limits.db")
+        return SQLiteTokenBucketLimiter(path, name.lower(), rate, burst)
+    return TokenBucketLimiter(rate, burst)
@@ -0,0 +1,224 @@
+import contextvars
+import functools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from fastapi import HTTPException
+
+from app.exceptions import CircuitOpenException, ServiceOverloadedException
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _is_failure(error: BaseException) -> bool:
+    """Dependency failures trip the breaker; 4xx results and local overload do not"""
+    if isinstance(error, (CircuitOpenException, ServiceOverloadedException)):
+        return False
+    if isinstance(error, HTTPException):
+        return error.status_code >= 500
+    return isinstance(error, Exception)
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures; while open,
+    calls fail immediately. After `reset_timeout` seconds one trial call is let
+    through (half-open): success closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    def before_call(self) -> None:
+        with self.lock:
+            if self.opened_at is None:
+                return
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0 or self.trial_running:
+                raise CircuitOpenException(self.name, max(1, int(remaining + 0.999)))
+            self.trial_running = True  # half-open: let this call through
+
+    def on_success(self) -> None:
+        with self.lock:
+            if self.opened_at is not None:
+                logger.info("Circuit %s closed", self.name)
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def on_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.warning(
+                        "Circuit %s opened after %d failures", self.name, self.failures
+                    )
+                    metrics.circuit_opened.inc(self.name)
+                self.opened_at = time.monotonic()
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        self.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            if _is_failure(e):
+                self.on_failure()
+            else:
+                self.on_success()
+            raise
+        self.on_success()
+        return result
+
+
+class StaleCache:
+    """Last successful result per call, served while the dependency is failing"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.entries: Dict[tuple, Any] = {}
+        self.lock = threading.Lock()
+
+    def put(self, key: tuple, value: Any) -> None:
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = value
+            if len(self.entries) > self.max_entries:
+                self.entries.pop(next(iter(self.entries)))
+
+    def get(self, key: tuple) -> Any:
+        with self.lock:
+            return self.entries.get(key)
+
+
+@functools.lru_cache(maxsize=None)
+def _breaker(name: str) -> CircuitBreaker:
+    # built on first use so settings from .env are already loaded
+    return CircuitBreaker(
+        name,
+        int(os.getenv("BREAKER_FAILURE_THRESHOLD", 5)),
+        float(os.getenv("BREAKER_RESET_SECONDS", 30)),
+    )
+
+
+def resilient(service: str, fallback: Iterable[str] = ()):
+    """
+    Class decorator adding a circuit breaker per public method ("service.method").
+    Methods named in `fallback` serve their last successful result when the
+    breaker is open or the call fails with a dependency error. They may be
+    private, so that raw documents are cached rather than results derived
+    from them that expire (e.g. presigned URLs).
+
+    BREAKER_FAILURE_THRESHOLD (default 5) and BREAKER_RESET_SECONDS (default 30)
+    configure the breakers; they are read when a breaker is first used.
+    """
+    fallback = set(fallback)
+
+    def wrap(func, operation):
+        name = f"{service}.{operation.lstrip('_')}"
+        cache = StaleCache() if operation in fallback else None
+
+        @functools.wraps(func)
+        def guarded(self, *args, **kwargs):
+            try:
+                result = _breaker(name).call(func, self, *args, **kwargs)
+            except BaseException as e:
+                if cache is None or not (
+                    isinstance(e, CircuitOpenException) or _is_failure(e)
+                ):
+                    raise
+                key = (args, tuple(sorted(kwargs.items())))
+                stale = cache.get(key)
+                if stale is None:
+                    raise
+                logger.warning("Serving cached %s after error: %s", name, e)
+                metrics.fallback_served.inc(name)
+                return stale
+            if cache is not None:
+                cache.put((args, tuple(sorted(kwargs.items()))), result)
+            return result
+
+        return guarded
+
+    def decorate(cls):
+        for name, attr in list(vars(cls).items()):
+            if callable(attr) and (not name.startswith("_") or name in fallback):
+                setattr(cls, name, wrap(attr, name))
+        return cls
+
+    return decorate
+
+
+# Shared pool for hedged requests; reads are only sent to it while a worker is free
+HEDGE_WORKERS = 16
+_hedge_pool = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="hedge")
+_hedge_slots = threading.BoundedSemaphore(HEDGE_WORKERS)
+
+
+def hedge_delay() -> Optional[float]:
+    """HEDGE_DELAY_MS enables hedged reads (unset or 0 disables them)"""
+    delay_ms = float(os.getenv("HEDGE_DELAY_MS", 0) or 0)
+    return delay_ms / 1000 if delay_ms > 0 else None
+
+
+def _submit(read: Callable[[], Any]) -> Optional[Future]:
+    """Run `read` in the hedge pool with the caller's context, if a worker is free"""
+    if not _hedge_slots.acquire(blocking=False):
+        return None
+    context = contextvars.copy_context()
+
+    def run():
+        try:
+            return context.run(read)
+        finally:
+            _hedge_slots.release()
+
+    return _hedge_pool.submit(run)
+
+
+def hedged(
+    read: Callable[[], Any], operation: str, delay: Optional[float] = None
+) -> Any:
+    """
+    Run an idempotent read; if it has not finished after `delay` seconds, send
+    the same read again and return whichever succeeds first (the error only if
+    both fail). When the hedge pool is saturated the read runs unhedged in the
+    calling thread.
+    """
+    delay = hedge_delay() if delay is None else delay
+    if not delay:
+        return read()
+
+    primary = _submit(read)
+    if primary is None:
+        return read()
+    done, _ = wait([primary], timeout=delay)
+    if done:
+        return primary.result()
+
+    hedge = _submit(read)
+    if hedge is None:
+        return primary.result()
+    metrics.hedged_requests.inc(operation)
+
+    pending = {primary, hedge}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+    raise error
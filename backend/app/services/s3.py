@@ -9,6 +9,9 @@ from app.exceptions import (
     S3PresignedException,
     S3UploadException,
 )
+from app.services.local_store import open_local_blob_client
+from app.services.bulkhead import s3_bulkhead
+from app.services.metrics import instrumented
 
 
 # lazy initialization
@@ -18,6 +21,8 @@ _s3_client = None
 def get_s3_client():
     """Get or create S3 client with lazy initialization"""
     global _s3_client
+    if _s3_client is None and os.getenv("BLOB_STORE", "s3").strip().lower() == "local":
+        _s3_client = open_local_blob_client()
     if _s3_client is None:
         access_key = os.getenv("AWS_ACCESS_KEY_ID", "").strip()
         secret_key = os.getenv("AWS_SECRET_ACCESS_KEY", "").strip()
@@ -35,11 +40,22 @@ def get_s3_client():
     return _s3_client
 
 
+def _reset_s3_client():
+    """Drop the client in forked children; boto3 clients are not fork-safe"""
+    global _s3_client
+    _s3_client = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_s3_client)
+
+
 def get_bucket_name() -> str:
     """Get S3 bucket name from environment"""
     return os.getenv("S3_BUCKET_NAME", "almaeng2")
 
 
+@instrumented("s3", bulkhead=s3_bulkhead)
 class S3Service:
     @staticmethod
     def upload_file(file_obj, key: str, content_type: str = "image/png") -> bool:
@@ -0,0 +1,25 @@
+import json
+from datetime import datetime
+from typing import Any, Dict
+
+
+def encode_document(data: Dict[str, Any]) -> str:
+    """Serialize document data to JSON, tagging datetimes so they round-trip"""
+
+    def default(value):
+        if isinstance(value, datetime):
+            return {"__datetime__": value.isoformat()}
+        raise TypeError(f"Unsupported type: {type(value).__name__}")
+
+    return json.dumps(data, default=default, sort_keys=True)
+
+
+def decode_document(raw: str) -> Dict[str, Any]:
+    """Deserialize document data written by encode_document"""
+
+    def object_hook(obj):
+        if "__datetime__" in obj:
+            return datetime.fromisoformat(obj["__datetime__"])
+        return obj
+
+    return json.loads(raw, object_hook=object_hook)
@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+from app.services.serialization import decode_document, encode_document
+
+logger = logging.getLogger(__name__)
+
+# Firestore allows at most 500 writes per batch
+MAX_BATCH_SIZE = 500
+
+
+class TransactionQueue:
+    """
+    Durable write-behind queue for new transactions.
+
+    Transactions are appended to a local SQLite write-ahead log and flushed to
+    Firestore in batches by a background task, so payment creation only waits
+    on local disk. Pending transactions can still be read and updated through
+    the queue until they are flushed.
+
+    Every worker process opens the same queue file, but only the one holding
+    an exclusive flock on "<path>.lock" flushes it. Two flushers could write
+    an old copy of a row back over an approval that the other already wrote.
+    The lock is released when that process exits, and another worker then
+    takes over.
+    """
+
+    def __init__(self):
+        self.conn: Optional[sqlite3.Connection] = None
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.flusher_lock_file = None
+        self.is_flusher = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.conn is not None
+
+    def open(self, path: str) -> None:
+        """Open (or create) the queue database at path"""
+        conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # FULL: an enqueued transaction already has a txid, so it must survive
+        # power loss, not only a process crash
+        conn.execute("PRAGMA synchronous=FULL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS pending (
+                txid TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                queued_at REAL NOT NULL
+            )
+            """)
+        self.conn = conn
+        self.flusher_lock_file = open(f"{path}.lock", "a")
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        if self.flusher_lock_file is not None:
+            self.flusher_lock_file.close()  # releases the flock
+            self.flusher_lock_file = None
+            self.is_flusher = False
+
+    def claim_flusher(self) -> bool:
+        """Become this queue file's only flusher if no other process is"""
+        if self.is_flusher:
+            return True
+        if fcntl is not None:
+            try:
+                fcntl.flock(
+                    self.flusher_lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB
+                )
+            except BlockingIOError:
+                return False
+        self.is_flusher = True
+        logger.info("This worker flushes the transaction queue")
+        return True
+
+    def enqueue(self, txid: str, data: Dict[str, Any]) -> None:
+        """Append a new transaction to the queue"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO pending (txid, data, queued_at) VALUES (?, ?, ?)",
+                (txid, encode_document(data), time.time()),
+            )
+
+    def get(self, txid: str) -> Optional[Dict[str, Any]]:
+        """Get a pending transaction, or None if it is not queued"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT data FROM pending WHERE txid = ?", (txid,)
+            ).fetchone()
+        return decode_document(row[0]) if row else None
+
+    def merge(self, txid: str, updates: Dict[str, Any]) -> bool:
+        """Merge updates into a pending transaction. Returns False if not queued."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT data FROM pending WHERE txid = ?", (txid,)
+            ).fetchone()
+            if not row:
+                return False
+            data = decode_document(row[0])
+            data.update(updates)
+            self.conn.execute(
+                "UPDATE pending SET data = ? WHERE txid = ?",
+                (encode_document(data), txid),
+            )
+        return True
+
+    def pending(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """All pending transactions as (txid, data), oldest first"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT txid, data FROM pending ORDER BY queued_at"
+            ).fetchall()
+        return [(txid, decode_document(data)) for txid, data in rows]
+
+    def pending_count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+
+    def flush(self, db, batch_size: int = MAX_BATCH_SIZE) -> int:
+        """
+        Write the oldest pending transactions to Firestore in one batch.
+
+        Rows are removed only if they were not modified while the batch was in
+        flight; modified rows are written again on the next flush.
+
+        Returns:
+            int: Number of transactions written
+        """
+        # the flush loop's worker thread may still be running during drain()
+        with self.flush_lock:
+            with self.lock:
+                rows = self.conn.execute(
+                    "SELECT txid, data FROM pending ORDER BY queued_at LIMIT ?",
+                    (min(batch_size, MAX_BATCH_SIZE),),
+                ).fetchall()
+            if not rows:
+                return 0
+
+            batch = db.batch()
+            for txid, data in rows:
+                batch.set(
+                    db.collection("transactions").document(txid), decode_document(data)
+                )
+
+            try:
+                batch.commit()
+            except Exception:
+                with self.lock:
+                    self.conn.executemany(
+                        "UPDATE pending SET attempts = attempts + 1 WHERE txid = ?",
+                        [(txid,) for txid, _ in rows],
+                    )
+                raise
+
+            with self.lock:
+                self.conn.executemany(
+                    "DELETE FROM pending WHERE txid = ? AND data = ?", rows
+                )
+            return len(rows)
+
+    async def run(self, db, interval: float = 0.5, max_backoff: float = 30.0) -> None:
+        """
+        Flush the queue until cancelled, backing off exponentially on errors.
+        Workers that are not the flusher keep trying to claim the role.
+        """
+        backoff = interval
+        while True:
+            if not self.claim_flusher():
+                await asyncio.sleep(interval)
+                continue
+            try:
+                written = await asyncio.to_thread(self.flush, db)
+                backoff = interval
+                if written:
+                    logger.debug("Flushed %d queued transactions", written)
+                    continue  # drain remaining rows without waiting
+            except Exception as e:
+                logger.warning("Transaction queue flush failed: %s", e)
+                backoff = min(backoff * 2, max_backoff)
+            await asyncio.sleep(backoff)
+
+    def drain(self, db) -> None:
+        """Flush everything synchronously (e.g. on shutdown) if this is the flusher"""
+        if not self.claim_flusher():
+            return  # the flushing worker writes these rows
+        while self.flush(db):
+            pass
+
+
+# create a singleton instance
+transaction_queue = TransactionQueue()
@@ -0,0 +1,198 @@
+"""
+Load test for the kiosk checkout path
+
+Drives the FastAPI app in-process (httpx ASGI transport) with concurrent
+workers against in-memory Firestore/S3 stand-ins, and reports p50/p95/p99
+latency and throughput per endpoint:
+
+    POST /api/payments/             (validation, QR rendering, transaction write)
+    POST /api/payments/approve
+    GET  /api/kiosks/{kid}/products
+    GET  /api/products/
+
+Use --latency-ms to simulate Firestore round trips. The handlers run in
+FastAPI's threadpool, so slow calls do not stall the event loop; they hold
+threadpool threads and Firestore bulkhead slots instead. Once the bulkhead
+is full (FIRESTORE_MAX_CONCURRENCY), requests wait up to
+FIRESTORE_MAX_WAIT_MS for a slot and then fail fast with a 503, which shows
+up in the err column.
+
+Usage (from backend/):
+    python -m benchmarks.load_test [--duration 10] [--concurrency 32]
+        [--latency-ms 0] [--products 50] [--kiosks 10] [--sqlite PATH]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.memory_firestore import install
+
+# relative weight of each scenario in the traffic mix
+SCENARIOS = {"checkout": 1, "kiosk_products": 3, "products": 1}
+
+
+def seed(products: int, kiosks: int) -> Dict[str, List[str]]:
+    """Create products and kiosks (each carrying every product) through FirebaseService"""
+    from app.services.firebase import firebase_service
+
+    pids = [
+        firebase_service.register_product(
+            {
+                "name": f"Refill product {i}",
+                "price": 30.0,
+                "description": "Eco-friendly refill product",
+                "image_url": f"products/prod_{i + 1:03d}.png",
+                "tags": ["shampoo", "refill"],
+                "original_price": 15000,
+                "original_gram": 500,
+            }
+        )
+        for i in range(products)
+    ]
+    kids = []
+    for i in range(kiosks):
+        kid = firebase_service.register_kiosk(
+            {"name": f"Kiosk {i}", "location": "Seoul", "status": "active"}
+        )
+        firebase_service.update_kiosk(
+            kid, {"products": [{"pid": pid, "available": True} for pid in pids]}
+        )
+        kids.append(kid)
+    return {"pids": pids, "kids": kids}
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def request(self, client, label: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies[label].append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 400:
+            self.errors[label] += 1
+        return response
+
+    def report(self, elapsed: float) -> None:
+        print(
+            f"{'endpoint':<32} {'count':>7} {'err':>5} {'rps':>8} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+        )
+        total = 0
+        for label, values in self.latencies.items():
+            values.sort()
+            total += len(values)
+            print(
+                f"{label:<32} {len(values):>7} {self.errors[label]:>5} "
+                f"{len(values) / elapsed:>8.1f} "
+                f"{percentile(values, 50):>8.2f} {percentile(values, 95):>8.2f} "
+                f"{percentile(values, 99):>8.2f} {values[-1]:>8.2f}"
+            )
+        print(f"{'total':<32} {total:>7} {'':>5} {total / elapsed:>8.1f}")
+
+
+async def worker(client, recorder: Recorder, ids, deadline: float, rng: random.Random):
+    names, weights = zip(*SCENARIOS.items())
+    while time.perf_counter() < deadline:
+        scenario = rng.choices(names, weights)[0]
+        kid = rng.choice(ids["kids"])
+
+        if scenario == "checkout":
+            response = await recorder.request(
+                client,
+                "POST /api/payments/",
+                "POST",
+                "/api/payments/",
+                json={
+                    "kid": kid,
+                    "pid": rng.choice(ids["pids"]),
+                    "amount_grams": 250,
+                    "extra_bottle": False,
+                    "product_price": 30,
+                    "total_price": 7500,
+                    "payment_method": rng.choice(["kakaopay", "tosspay"]),
+                    "manager": "SOHN",
+                },
+            )
+            if response.status_code == 200:
+                await recorder.request(
+                    client,
+                    "POST /api/payments/approve",
+                    "POST",
+                    "/api/payments/approve",
+                    json={"txid": response.json()["txid"]},
+                )
+        elif scenario == "kiosk_products":
+            await recorder.request(
+                client,
+                "GET /api/kiosks/{kid}/products",
+                "GET",
+                f"/api/kiosks/{kid}/products",
+            )
+        else:
+            await recorder.request(
+                client, "GET /api/products/", "GET", "/api/products/"
+            )
+
+
+async def run(duration: float, concurrency: int, ids) -> None:
+    from main import app
+
+    recorder = Recorder()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://loadtest"
+    ) as client:
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(
+            *(
+                worker(client, recorder, ids, deadline, random.Random(i))
+                for i in range(concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - start
+    recorder.report(elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument(
+        "--latency-ms", type=float, default=0.0, help="simulated Firestore RTT"
+    )
+    parser.add_argument("--products", type=int, default=50)
+    parser.add_argument("--kiosks", type=int, default=10)
+    parser.add_argument(
+        "--sqlite", metavar="PATH", help="use the SQLite store instead of memory"
+    )
+    args = parser.parse_args()
+
+    db = install(latency_ms=0, sqlite_path=args.sqlite)
+    ids = seed(args.products, args.kiosks)
+    db.latency = args.latency_ms / 1000
+
+    print(
+        f"{args.concurrency} workers for {args.duration:.0f}s, "
+        f"{args.products} products, {args.kiosks} kiosks, "
+        f"{'SQLite' if args.sqlite else 'memory'} store, "
+        f"Firestore latency {args.latency_ms} ms"
+    )
+    asyncio.run(run(args.duration, args.concurrency, ids))
+
+
+if __name__ == "__main__":
+    main()
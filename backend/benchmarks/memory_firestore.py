@@ -0,0 +1,56 @@
+"""
+In-memory stand-ins for the Firestore client and the boto3 S3 client
+
+The document stores come from app.services.local_store (the same ones behind
+STORAGE_BACKEND=memory/sqlite); MemoryS3Client keeps uploads in memory. An
+optional per-call latency simulates Firestore round trips. The write rate
+limits are raised so a load test measures the service rather than 429s.
+
+Usage:
+    from benchmarks.memory_firestore import install
+    install(latency_ms=5)  # points firebase_service and s3_service at the stand-ins
+"""
+
+import os
+from typing import Dict, Optional
+
+from app.services.local_store import MemoryFirestore, SQLiteFirestore
+
+
+class MemoryS3Client:
+    """boto3 S3 client stand-in for upload_fileobj and generate_presigned_url"""
+
+    def __init__(self):
+        self.objects: Dict[str, bytes] = {}
+
+    def upload_fileobj(self, Fileobj, Bucket, Key, ExtraArgs=None):
+        self.objects[f"{Bucket}/{Key}"] = Fileobj.read()
+
+    def generate_presigned_url(self, ClientMethod, Params, ExpiresIn=3600):
+        return (
+            f"https://{Params['Bucket']}.s3.amazonaws.com/{Params['Key']}"
+            f"?X-Amz-Expires={ExpiresIn}&X-Amz-Signature={'0' * 64}"
+        )
+
+
+def install(
+    latency_ms: float = 0.0, sqlite_path: Optional[str] = None
+) -> MemoryFirestore:
+    """Point firebase_service and s3_service at in-memory (or SQLite) stand-ins"""
+    from app.routes.rate_limits import LIMITS, _limiter
+    from app.services import s3
+    from app.services.firebase import firebase_service
+
+    # Unthrottled unless set explicitly in the environment
+    for name in LIMITS:
+        os.environ.setdefault(f"{name.upper()}_RATE", "1e9")
+        os.environ.setdefault(f"{name.upper()}_BURST", "1e9")
+    _limiter.cache_clear()
+
+    if sqlite_path:
+        db = SQLiteFirestore(sqlite_path, latency_ms)
+    else:
+        db = MemoryFirestore(latency_ms)
+    firebase_service.db = db
+    s3._s3_client = MemoryS3Client()
+    return db
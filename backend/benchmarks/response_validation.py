@@ -0,0 +1,61 @@
+"""
+Response validation benchmark for list endpoints
+
+Compares the old get_transactions path (raw dicts re-validated against
+response_model=List[dict], then rendered) with returning TransactionOut models
+built once in the service layer and dumped straight to JSON bytes.
+
+Usage (from backend/):
+    python -m benchmarks.response_validation [--items 2000] [--repeat 20]
+"""
+
+import argparse
+import time
+from typing import List
+
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+
+from app.models import TransactionOut
+from app.routes.responses import model_list_response
+from benchmarks.serialization import make_transactions
+
+
+def bench(label: str, fn, items: int, repeat: int) -> None:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed_ms = (time.perf_counter() - start) / repeat * 1000
+    print(
+        f"  {label:<24} {elapsed_ms:8.2f} ms/response  "
+        f"{elapsed_ms * 1000 / items:6.2f} us/item"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    raw = make_transactions(args.items)
+    dict_adapter = TypeAdapter(List[dict])
+
+    def dict_response():
+        # What FastAPI does for response_model=List[dict]
+        value = dict_adapter.validate_python(raw)
+        return ORJSONResponse(dict_adapter.dump_python(value, mode="json")).body
+
+    def model_response():
+        # Service layer validates once, route dumps bytes directly
+        models = [TransactionOut.model_validate(t) for t in raw]
+        return model_list_response(TransactionOut, models).body
+
+    print(f"get_transactions ({args.items} items)")
+    bench("List[dict] re-validation", dict_response, args.items, args.repeat)
+    bench("TransactionOut bytes", model_response, args.items, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Serialization benchmark for list endpoint payloads
+
+Compares rendering with the default JSONResponse (json.dumps) against
+ORJSONResponse for payloads shaped like get_transactions and get_all_products.
+Payloads are first encoded the way FastAPI does for a response_model, and the
+gzip-compressed size is reported alongside the raw size.
+
+Usage (from backend/):
+    python -m benchmarks.serialization [--items 2000] [--repeat 20]
+"""
+
+import argparse
+import gzip
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from app.models import Product
+from app.services.firebase import KST
+
+PRESIGNED_URL = (
+    "https://almaeng2.s3.ap-northeast-2.amazonaws.com/products/prod_{:03d}.png"
+    "?X-Amz-Algorithm=AWS4-HMAC-SHA256&X-Amz-Credential=AKIAEXAMPLE%2F20251019"
+    "%2Fap-northeast-2%2Fs3%2Faws4_request&X-Amz-Date=20251019T000000Z"
+    "&X-Amz-Expires=3600&X-Amz-SignedHeaders=host&X-Amz-Signature=" + "f" * 64
+)
+
+
+def make_transactions(n: int) -> list:
+    """Build transaction dicts shaped like FirebaseService.query_transactions"""
+    now = datetime.now(KST)
+    return [
+        {
+            "transaction_id": f"tx{i:018d}",
+            "kid": f"kiosk_{i % 20:03d}",
+            "pid": f"prod_{i % 50:03d}",
+            "amount_grams": 250 + i % 300,
+            "extra_bottle": i % 3 == 0,
+            "product_price": 30,
+            "total_price": 7500 + i,
+            "payment_method": "kakaopay" if i % 2 else "tosspay",
+            "manager": "SOHN",
+            "status": "COMPLETED",
+            "completed": True,
+            "created_at": now - timedelta(minutes=i),
+            "approved_at": now - timedelta(minutes=i) + timedelta(seconds=30),
+            "updated_at": now - timedelta(minutes=i) + timedelta(seconds=30),
+        }
+        for i in range(n)
+    ]
+
+
+def make_products(n: int) -> list:
+    """Build Product models shaped like FirebaseService.get_all_products"""
+    return [
+        Product(
+            pid=f"prod_{i:03d}",
+            name=f"Refill product {i}",
+            price=30.0,
+            description="Eco-friendly refill product " * 4,
+            image_url=PRESIGNED_URL.format(i),
+            tags=["shampoo", "refill", "vegan"],
+            original_price=15000,
+            original_gram=500,
+        )
+        for i in range(n)
+    ]
+
+
+def bench(label: str, fn, repeat: int) -> bytes:
+    body = fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed_ms = (time.perf_counter() - start) / repeat * 1000
+    print(
+        f"  {label:<14} {elapsed_ms:8.2f} ms/response  "
+        f"{len(body) / 1024:8.1f} KiB raw  "
+        f"{len(gzip.compress(body)) / 1024:8.1f} KiB gzip"
+    )
+    return body
+
+
+def run(name: str, payload: list, response_model, repeat: int) -> None:
+    print(f"{name} ({len(payload)} items)")
+    content = TypeAdapter(response_model).dump_python(payload, mode="json")
+    bench("JSONResponse", lambda: JSONResponse(content).body, repeat)
+    bench("ORJSONResponse", lambda: ORJSONResponse(content).body, repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    run("get_transactions", make_transactions(args.items), List[dict], args.repeat)
+    run("get_all_products", make_products(args.items), List[Product], args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,30 @@
+import asyncio
+import logging
 import os
+import time
+import uuid
 
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from fastapi.staticfiles import StaticFiles
 
-from app.routes import kiosks, payments, products
+from app.logging_config import request_id, setup_logging
+from app.routes import admin, kiosks, payments, products, telemetry
+from app.services.catalog_snapshot import catalog_snapshot
 from app.services.firebase import firebase_service
+from app.services.local_store import local_blob_dir
+from app.services.metrics import metrics, request_timings, server_timing_header
+from app.services.transaction_queue import transaction_queue
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+access_logger = logging.getLogger("app.access")
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Kiosk Management API",
@@ -17,6 +32,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
 )
 
 # Configure CORS middleware
@@ -42,29 +58,133 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Configure response compression (opt-in)
+# RESPONSE_COMPRESSION: "gzip", "br" (brotli, requires brotli-asgi) or unset
+compression = os.getenv("RESPONSE_COMPRESSION", "").strip().lower()
+compression_min_size = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+
+if compression == "br":
+    try:
+        from brotli_asgi import BrotliMiddleware
+
+        app.add_middleware(
+            BrotliMiddleware, minimum_size=compression_min_size, gzip_fallback=True
+        )
+    except ImportError:
+        logger.warning("brotli-asgi is not installed, falling back to gzip")
+        compression = "gzip"
+
+if compression == "gzip":
+    app.add_middleware(GZipMiddleware, minimum_size=compression_min_size)
+
+
+# Per-request context: request id, Server-Timing breakdown and latency histograms
+@app.middleware("http")
+async def timing_middleware(request: Request, call_next):
+    rid = request.headers.get("x-request-id") or uuid.uuid4().hex
+    rid_token = request_id.set(rid)
+    timings = {}
+    token = request_timings.set(timings)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        request_timings.reset(token)
+        request_id.reset(rid_token)
+    elapsed = time.perf_counter() - start
+
+    route = request.scope.get("route")
+    metrics.http_requests.observe(
+        elapsed,
+        request.method,
+        route.path if route else "unmatched",
+        str(response.status_code),
+    )
+    response.headers["Server-Timing"] = server_timing_header(timings, elapsed)
+    response.headers["X-Request-ID"] = rid
+    access_logger.info(
+        "%s %s %d",
+        request.method,
+        request.url.path,
+        response.status_code,
+        extra={"request_id": rid, "duration_ms": round(elapsed * 1000, 2)},
+    )
+    return response
+
 
 # Startup event
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on application startup"""
-    print("Starting Kiosk Management API...")
+    # Configure queue-based structured logging here rather than at import, so
+    # importing the app (tests, benchmarks) leaves the root logger alone
+    setup_logging()
+    logger.info("Starting Kiosk Management API...")
 
     try:
         # Initialize Firebase
         firebase_service.initialize()
-        print("Firebase initialized successfully")
+        logger.info("Firebase initialized successfully")
     except Exception as e:
-        print(f"Warning: Firebase initialization failed: {e}")
-        print("The API will run but database operations may not work correctly")
-
-    print("API is ready to accept requests")
+        logger.warning(
+            "Firebase initialization failed: %s. The API will run but database "
+            "operations may not work correctly",
+            e,
+        )
+
+    # Index product assignments of kiosks created before product_ids existed
+    if firebase_service.db:
+        try:
+            backfilled = firebase_service.backfill_kiosk_product_ids()
+            if backfilled:
+                logger.info("Added product_ids to %d kiosks", backfilled)
+        except Exception as e:
+            logger.warning("Kiosk product_ids backfill failed: %s", e)
+
+    # Start write-behind transaction queue (opt-in)
+    queue_path = os.getenv("TRANSACTION_QUEUE_PATH")
+    if queue_path and firebase_service.db:
+        transaction_queue.open(queue_path)
+        app.state.transaction_queue_task = asyncio.create_task(
+            transaction_queue.run(firebase_service.db)
+        )
+        logger.info(
+            "Transaction queue started (%d pending)", transaction_queue.pending_count()
+        )
+
+    # Mirror products and kiosks in memory for catalog reads
+    if catalog_snapshot.enabled and firebase_service.db:
+        catalog_snapshot.start(firebase_service.db)
+
+    logger.info("API is ready to accept requests")
 
 
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on application shutdown"""
-    print("Shutting down Kiosk Management API...")
+    logger.info("Shutting down Kiosk Management API...")
+
+    catalog_snapshot.stop()
+
+    # Stop the queue and flush what is left
+    task = getattr(app.state, "transaction_queue_task", None)
+    if task:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        try:
+            # off the event loop; waits for a flush still running in its thread
+            await asyncio.to_thread(transaction_queue.drain, firebase_service.db)
+        except Exception as e:
+            logger.warning(
+                "%d transactions left in queue: %s",
+                transaction_queue.pending_count(),
+                e,
+            )
+        transaction_queue.close()
 
 
 # Root endpoint
@@ -89,13 +209,29 @@ async def health_check():
     }
 
 
+# Prometheus metrics endpoint
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Request and service call latency histograms in Prometheus text format"""
+    return metrics.render()
+
+
 # Register routers
+# (API handlers are plain functions: FastAPI runs them in its threadpool, so the
+# blocking Firestore/S3 calls stay off the event loop, bounded by the bulkheads)
 app.include_router(kiosks.router, prefix="/api")
 app.include_router(payments.router, prefix="/api")
 app.include_router(products.router, prefix="/api")
+app.include_router(telemetry.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
+
+# Serve uploaded images from disk when S3 is replaced by the local blob store
+if os.getenv("BLOB_STORE", "s3").strip().lower() == "local":
+    os.makedirs(local_blob_dir(), exist_ok=True)
+    app.mount("/files", StaticFiles(directory=local_blob_dir()), name="files")
 
 
-# Run the application
+# Run the development server with auto-reload (production: python serve.py)
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,77 @@
+"""
+Production entrypoint: multiple uvicorn workers sized to the machine
+
+Each worker is a separate process that imports main:app and runs
+startup_event itself, so the Firebase app, Firestore gRPC channel and boto3
+S3 client are created inside the worker rather than shared across processes.
+uvloop and httptools are used when installed (loop/http "auto").
+
+Environment:
+    PORT, HOST
+    WEB_CONCURRENCY: number of workers (default: CPU count)
+    KEEP_ALIVE: seconds to keep idle HTTP connections open (default 5)
+    GRACEFUL_TIMEOUT: seconds to let in-flight requests finish on shutdown (default 30)
+    FORWARDED_ALLOW_IPS: proxies trusted for X-Forwarded-* headers (default
+        127.0.0.1, or the private ranges on Railway). Set it to the load
+        balancer's address; "*" would let any client choose its own IP (and
+        rate-limit bucket) with X-Forwarded-For.
+
+On Railway (RAILWAY_ENVIRONMENT is set) the edge proxy reaches the container
+from Railway's private network, not from 127.0.0.1, so the private ranges are
+trusted there. uvicorn reads X-Forwarded-For from the right and stops at the
+first untrusted address, which is the client the edge proxy appended; entries
+a client sends itself are further left and are ignored.
+
+Workers share TRANSACTION_QUEUE_PATH; only one of them at a time flushes it
+(see TransactionQueue).
+
+Usage:
+    python serve.py
+"""
+
+import os
+
+import uvicorn
+from dotenv import load_dotenv
+
+# addresses Railway's edge proxy can connect from (private and shared ranges)
+RAILWAY_PROXY_NETWORKS = "10.0.0.0/8,100.64.0.0/10,172.16.0.0/12,192.168.0.0/16"
+
+
+def worker_count() -> int:
+    configured = os.getenv("WEB_CONCURRENCY")
+    if configured:
+        return max(1, int(configured))
+    return os.cpu_count() or 1
+
+
+def forwarded_allow_ips() -> str:
+    configured = os.getenv("FORWARDED_ALLOW_IPS")
+    if configured:
+        return configured
+    if os.getenv("RAILWAY_ENVIRONMENT"):
+        return RAILWAY_PROXY_NETWORKS
+    return "127.0.0.1"
+
+
+def main():
+    load_dotenv()
+    uvicorn.run(
+        "main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", 8000)),
+        workers=worker_count(),
+        loop="auto",
+        http="auto",
+        timeout_keep_alive=int(os.getenv("KEEP_ALIVE", 5)),
+        timeout_graceful_shutdown=int(os.getenv("GRACEFUL_TIMEOUT", 30)),
+        proxy_headers=True,
+        forwarded_allow_ips=forwarded_allow_ips(),
+        # requests are logged by the app (app.access) with request id and duration
+        access_log=False,
+        log_level=os.getenv("LOG_LEVEL", "info").lower(),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+from app.services.rate_limiter import TokenBucketLimiter
+
+
+def test_allowed_requests_stay_within_max_keys():
+    limiter = TokenBucketLimiter(rate=1, burst=2, max_keys=100)
+
+    for i in range(5000):
+        assert limiter.acquire(f"client {i}") == 0
+
+    assert len(limiter._buckets) == 100
+
+
+def test_recently_used_key_keeps_its_bucket():
+    limiter = TokenBucketLimiter(rate=0.001, burst=1, max_keys=2)
+
+    assert limiter.acquire("kiosk") == 0
+    limiter.acquire("a")
+    assert limiter.acquire("kiosk") > 0  # used again, so evicted last
+    limiter.acquire("b")
+
+    assert limiter.acquire("kiosk") > 0
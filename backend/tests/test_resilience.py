@@ -0,0 +1,76 @@
+import contextvars
+import threading
+import time
+
+import pytest
+
+from app.services.resilience import hedged
+
+request_id = contextvars.ContextVar("request_id", default="-")
+
+
+def slow_then_fast(primary_seconds: float, hedge_seconds: float):
+    """A read whose first call takes primary_seconds and later calls hedge_seconds"""
+    calls = []
+    lock = threading.Lock()
+
+    def read():
+        with lock:
+            calls.append(threading.current_thread().name)
+            first = len(calls) == 1
+        time.sleep(primary_seconds if first else hedge_seconds)
+        return "primary" if first else "hedge"
+
+    return read, calls
+
+
+def test_slow_primary_is_raced_by_hedge():
+    read, calls = slow_then_fast(primary_seconds=1.0, hedge_seconds=0.01)
+
+    start = time.perf_counter()
+    result = hedged(read, "test", delay=0.05)
+    elapsed = time.perf_counter() - start
+
+    assert result == "hedge"
+    assert len(calls) == 2
+    assert elapsed < 0.05 + 0.01 + 0.2  # delay + hedge, not the 1 s primary
+
+
+def test_fast_primary_sends_no_hedge():
+    read, calls = slow_then_fast(primary_seconds=0.0, hedge_seconds=0.0)
+
+    assert hedged(read, "test", delay=0.05) == "primary"
+    time.sleep(0.1)
+    assert len(calls) == 1
+
+
+def test_failed_hedge_falls_back_to_primary():
+    calls = []
+
+    def read():
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(0.2)
+            return "primary"
+        raise RuntimeError("hedge failed")
+
+    assert hedged(read, "test", delay=0.02) == "primary"
+
+
+def test_error_raised_when_both_fail():
+    def read():
+        time.sleep(0.05)
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError, match="down"):
+        hedged(read, "test", delay=0.01)
+
+
+def test_reads_see_callers_context():
+    request_id.set("req-1")
+
+    def read():
+        time.sleep(0.1)
+        return request_id.get()
+
+    assert hedged(read, "test", delay=0.02) == "req-1"
@@ -0,0 +1,162 @@
+# capture.py
+"""
+Fixed-width binary capture format for BLE notifications.
+
+Layout:
+  header (16 bytes): magic b"BLECAP01", uint32 record size, uint32 max payload
+  records (42 bytes each, little-endian):
+    int64  ts_ns    - time.time_ns() when the notification arrived
+    uint16 len      - payload length (payloads longer than MAX_PAYLOAD are cut)
+    bytes  data[32] - payload, zero padded
+
+Records are written through a large buffered file and fsync'd periodically
+instead of flushing every notification. Because every record has the same
+size, a capture can be memory-mapped as a NumPy structured array.
+
+SampleQueue sits between the BLE callback and the writer (no bleak dependency,
+so captures can also be replayed through it by simulate.py).
+"""
+
+import asyncio
+import os
+import struct
+import time
+from typing import Optional
+
+MAGIC = b"BLECAP01"
+MAX_PAYLOAD = 32
+
+HEADER = struct.Struct("<8sII")
+RECORD = struct.Struct(f"<qH{MAX_PAYLOAD}s")
+
+
+def record_dtype():
+    """NumPy dtype matching RECORD (packed, little-endian)"""
+    import numpy as np
+
+    return np.dtype(
+        [("ts_ns", "<i8"), ("len", "<u2"), ("data", np.uint8, (MAX_PAYLOAD,))]
+    )
+
+
+class CaptureWriter:
+    """Buffered writer for the binary capture format"""
+
+    def __init__(
+        self,
+        path: str,
+        fsync_interval: float = 1.0,
+        buffer_size: int = 1 << 20,
+    ):
+        self.path = path
+        self.fsync_interval = fsync_interval
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.f = open(path, "ab", buffering=buffer_size)
+        if new_file:
+            self.f.write(HEADER.pack(MAGIC, RECORD.size, MAX_PAYLOAD))
+        else:
+            check_header(path)
+        self.count = 0
+        self.last_sync = time.monotonic()
+
+    def write(self, data: bytes, ts_ns: Optional[int] = None) -> None:
+        if ts_ns is None:
+            ts_ns = time.time_ns()
+        self.f.write(RECORD.pack(ts_ns, min(len(data), MAX_PAYLOAD), data))
+        self.count += 1
+        now = time.monotonic()
+        if now - self.last_sync >= self.fsync_interval:
+            self.sync()
+            self.last_sync = now
+
+    def sync(self) -> None:
+        """Flush the buffer and fsync to disk"""
+        self.f.flush()
+        os.fsync(self.f.fileno())
+
+    def close(self) -> None:
+        if not self.f.closed:
+            self.sync()
+            self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def check_header(path: str) -> None:
+    with open(path, "rb") as f:
+        magic, record_size, max_payload = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or record_size != RECORD.size or max_payload != MAX_PAYLOAD:
+        raise ValueError(f"{path} is not a {MAGIC.decode()} capture file")
+
+
+def load_capture(path: str):
+    """Memory-map a capture file as a NumPy structured array (ts_ns, len, data)"""
+    import numpy as np
+
+    check_header(path)
+    # ignore a trailing partial record (e.g. capture killed mid-write)
+    n = (os.path.getsize(path) - HEADER.size) // RECORD.size
+    if n == 0:
+        return np.zeros(0, dtype=record_dtype())
+    return np.memmap(
+        path, dtype=record_dtype(), mode="r", offset=HEADER.size, shape=(n,)
+    )
+
+
+class SampleQueue:
+    """
+    Bounded queue between the BLE notification callback and a writer task.
+    The callback only timestamps the payload and enqueues it; decoding and
+    disk writes happen in consume(), in batches.
+    """
+
+    def __init__(self, maxsize: int = 10000, late_after: float = 1.0):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.late_after_ns = int(late_after * 1e9)
+        self.dropped = 0  # queue was full when the sample arrived
+        self.late = 0  # written more than late_after seconds after arrival
+        self.written = 0
+
+    def push(self, data: bytes, ts_ns: Optional[int] = None):
+        try:
+            self.queue.put_nowait((ts_ns or time.time_ns(), data))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def callback(self, _: int, data: bytearray):
+        """bleak notification callback (sync, so no task is created per sample)"""
+        self.push(bytes(data))
+
+    async def consume(self, write_batch, batch_size: int = 256):
+        """Write queued samples in batches until close() is called"""
+        done = False
+        while not done:
+            batch = []
+            item = await self.queue.get()
+            while True:
+                if item is None:
+                    done = True
+                    break
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    break
+                try:
+                    item = self.queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+            if batch:
+                now = time.time_ns()
+                self.late += sum(1 for ts, _ in batch if now - ts > self.late_after_ns)
+                write_batch(batch)
+                self.written += len(batch)
+
+    async def close(self):
+        """Stop consume() after the remaining samples are written"""
+        await self.queue.put(None)
+
+    def stats(self) -> str:
+        return f"written={self.written} dropped={self.dropped} late={self.late}"
@@ -1,40 +1,105 @@
+import sys
+
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-
-# CSV 읽기
-df = pd.read_csv("fff1-v4.csv")
-
-# timestamp를 datetime으로 변환
-df['timestamp'] = pd.to_datetime(df['timestamp_iso'])
-
-# 'ffffffff...' 같은 초기값 제거
-df = df[~df['hex'].str.startswith('ff')]
-
-# 중간 바이트 추출 함수 (예: 9~12번째 바이트)
-def extract_middle_value(hex_str):
-    # 16~28번째 글자 추출 (hex string 기준)
-    middle_hex = hex_str[16:28]
-    
-    # 앞쪽 연속된 '0' 제거
-    middle_hex_trimmed = middle_hex.lstrip('0')
-    
-    # 10진수로 변환
-    if middle_hex_trimmed == "":
-        value = 0
-    else:
-        value = int(middle_hex_trimmed, 16)
-    
-    print(f"Extracted middle hex: {middle_hex_trimmed}, as decimal: {value}")
-    return value
-
-# weight_val 컬럼 생성
-df['weight_val'] = df['hex'].apply(extract_middle_value)
-
-# 그래프 그리기
-plt.figure(figsize=(10,4))
-plt.plot(df['timestamp'], df['weight_val'], marker='o')
-plt.xlabel("Time")
-plt.ylabel("Weight (raw value)")
-plt.title("Weight changes over time (excluding ffffff...)")
-plt.grid(True)
-plt.show()
+
+import capture
+from scale_protocol import GOTOBAKE
+
+# 무게 값이 들어있는 구간 (scale_protocol.GOTOBAKE: 바이트 8~14 = hex 16~28번째 글자)
+WEIGHT_BYTE_START = GOTOBAKE.offset
+WEIGHT_BYTE_END = GOTOBAKE.end
+WEIGHT_HEX_START = WEIGHT_BYTE_START * 2
+WEIGHT_HEX_END = WEIGHT_BYTE_END * 2
+WEIGHT_HEX_WIDTH = WEIGHT_HEX_END - WEIGHT_HEX_START
+
+# ASCII 코드 -> 16진수 값 변환 테이블
+_HEX_LUT = np.zeros(256, dtype=np.int64)
+_HEX_LUT[np.frombuffer(b"0123456789", dtype=np.uint8)] = np.arange(10)
+_HEX_LUT[np.frombuffer(b"abcdef", dtype=np.uint8)] = np.arange(10, 16)
+_HEX_LUT[np.frombuffer(b"ABCDEF", dtype=np.uint8)] = np.arange(10, 16)
+
+# 자리별 가중치 (16^11 ... 16^0)
+_HEX_WEIGHTS = 16 ** np.arange(WEIGHT_HEX_WIDTH - 1, -1, -1, dtype=np.int64)
+
+
+def hex_to_int(hex_strings: pd.Series) -> np.ndarray:
+    """
+    같은 길이(WEIGHT_HEX_WIDTH)의 hex 문자열들을 한 번에 정수로 변환
+    문자열을 하나의 바이트 버퍼로 합친 뒤 np.frombuffer로 (n, width) 행렬을 만든다
+    """
+    if len(hex_strings) == 0:
+        return np.zeros(0, dtype=np.int64)
+    buf = "".join(hex_strings.tolist()).encode("ascii")
+    digits = _HEX_LUT[np.frombuffer(buf, dtype=np.uint8)].reshape(-1, WEIGHT_HEX_WIDTH)
+    return digits @ _HEX_WEIGHTS
+
+
+def decode_weights(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    'hex' 컬럼에서 무게 값을 벡터 연산으로 추출
+
+    - 'ffffffff...' 같은 초기값 행 제거
+    - hex 문자열 16~28번째 글자를 10진수로 변환해 'weight_val' 컬럼에 저장
+      (짧은 문자열은 앞을 '0'으로 채워 기존 int(..., 16) 결과와 동일하게 맞춤)
+    """
+    df = df[~df["hex"].str.startswith("ff")].copy()
+    middle = (
+        df["hex"]
+        .str.slice(WEIGHT_HEX_START, WEIGHT_HEX_END)
+        .str.pad(WEIGHT_HEX_WIDTH, side="left", fillchar="0")
+    )
+    df["weight_val"] = hex_to_int(middle)
+    return df
+
+
+def decode_weights_from_bytes(records: np.ndarray) -> pd.DataFrame:
+    """
+    바이너리 캡처(capture.py) 레코드에서 무게 값을 추출
+    hex 기준 16~28번째 글자 = 바이트 8~14 구간을 big-endian 정수로 읽는다
+    (payload가 짧으면 있는 바이트까지만 사용해 CSV 경로와 같은 값을 만든다)
+    """
+    data = np.asarray(records["data"][:, WEIGHT_BYTE_START:WEIGHT_BYTE_END], np.int64)
+    end = np.clip(records["len"].astype(np.int64), WEIGHT_BYTE_START, WEIGHT_BYTE_END)
+    pos = np.arange(WEIGHT_BYTE_START, WEIGHT_BYTE_END)
+    shift = (end[:, None] - 1 - pos) * 8
+    weights = np.where(shift >= 0, data << np.maximum(shift, 0), 0).sum(axis=1)
+
+    # 'ff'로 시작하는 초기값 행 제거
+    keep = ~((records["len"] > 0) & (records["data"][:, 0] == 0xFF))
+    return pd.DataFrame(
+        {
+            "timestamp": pd.to_datetime(records["ts_ns"][keep], unit="ns"),
+            "weight_val": weights[keep],
+        }
+    )
+
+
+def load_capture(path: str) -> pd.DataFrame:
+    """
+    track.py로 저장한 캡처를 읽어 timestamp와 weight_val 컬럼을 만든다
+    .bin 파일은 memory-map으로 바로 읽고, 그 외에는 CSV로 읽는다
+    """
+    if path.endswith(".bin"):
+        return decode_weights_from_bytes(capture.load_capture(path))
+
+    df = pd.read_csv(path, usecols=["timestamp_iso", "hex"], dtype={"hex": str})
+    df["timestamp"] = pd.to_datetime(df["timestamp_iso"])
+    return decode_weights(df)
+
+
+def plot_weights(df: pd.DataFrame) -> None:
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 4))
+    plt.plot(df["timestamp"], df["weight_val"], marker="o")
+    plt.xlabel("Time")
+    plt.ylabel("Weight (raw value)")
+    plt.title("Weight changes over time (excluding ffffff...)")
+    plt.grid(True)
+    plt.show()
+
+
+if __name__ == "__main__":
+    csv_file = sys.argv[1] if len(sys.argv) > 1 else "fff1-v4.csv"
+    plot_weights(load_capture(csv_file))
@@ -0,0 +1,127 @@
+# scale_protocol.py
+"""
+Weight frame decoders for the BLE scales used in the refill station.
+
+Each device gets a ScaleDecoder built on a precompiled struct.Struct, so the
+same decoder can be used for offline analysis (decode_many over a capture
+buffer) and for a live stream (decode per notification).
+
+Known framing:
+  GOTOBAKE - weight is a 48-bit big-endian integer in bytes 8..14 of the frame
+             (hex chars 16..28, found with graph.py). Frames starting with 0xff
+             are initialization frames and carry no weight.
+  HOTO, LFC - not identified yet. Capture with track.py and add a layout here.
+
+Usage:
+  python scale_protocol.py   # microbenchmark
+"""
+
+import struct
+from functools import lru_cache
+from typing import Dict, List, Optional, Union
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+@lru_cache(maxsize=64)
+def _frame_struct(offset: int, frame_size: int) -> struct.Struct:
+    # compiled once per layout; decode_many is called once per capture chunk
+    return struct.Struct(f">B{offset - 1}xHI{frame_size - offset - 6}x")
+
+
+class ScaleDecoder:
+    """
+    Decoder for a 48-bit big-endian weight field at a fixed offset.
+    The field is read as (uint16 high, uint32 low) since struct has no 6-byte type.
+    """
+
+    def __init__(self, name: str, offset: int, init_byte: Optional[int] = 0xFF):
+        # the frame layout reads the first byte separately (init frame check)
+        if offset < 1:
+            raise ValueError(f"{name} weight offset must be at least 1, got {offset}")
+        self.name = name
+        self.offset = offset
+        self.end = offset + 6
+        self.init_byte = init_byte
+        self.field = struct.Struct(">HI")
+
+    def is_init_frame(self, frame: Buffer) -> bool:
+        return self.init_byte is not None and len(frame) > 0 and frame[0] == self.init_byte
+
+    def decode(self, frame: Buffer) -> Optional[int]:
+        """Decode one frame. Returns None for init frames or frames too short."""
+        if len(frame) < self.end or self.is_init_frame(frame):
+            return None
+        hi, lo = self.field.unpack_from(frame, self.offset)
+        return (hi << 32) | lo
+
+    def frame_struct(self, frame_size: int) -> struct.Struct:
+        """Layout of a whole frame: (first byte, weight high, weight low)"""
+        if frame_size < self.end:
+            raise ValueError(f"{self.name} frames need at least {self.end} bytes")
+        return _frame_struct(self.offset, frame_size)
+
+    def decode_many(self, buffer: Buffer, frame_size: int) -> List[int]:
+        """
+        Decode a buffer of back-to-back fixed-size frames (init frames skipped).
+        A trailing partial frame is ignored.
+        """
+        layout = self.frame_struct(frame_size)
+        view = memoryview(buffer)
+        view = view[: len(view) - len(view) % frame_size]
+        init_byte = self.init_byte
+        return [
+            (hi << 32) | lo
+            for first, hi, lo in layout.iter_unpack(view)
+            if first != init_byte
+        ]
+
+
+GOTOBAKE = ScaleDecoder("GOTOBAKE", offset=8)
+
+# Env name (see track.py: <NAME>_ADDRESS) -> decoder
+DECODERS: Dict[str, ScaleDecoder] = {
+    "GOTOBAKE": GOTOBAKE,
+}
+
+UNIDENTIFIED = ("HOTO", "LFC")
+
+
+def get_decoder(device: str) -> ScaleDecoder:
+    device = device.upper()
+    if device in DECODERS:
+        return DECODERS[device]
+    if device in UNIDENTIFIED:
+        raise KeyError(f"{device} weight framing is not identified yet")
+    raise KeyError(f"Unknown scale: {device}")
+
+
+def _benchmark(n: int = 1_000_000, frame_size: int = 16):
+    import random
+    import time
+
+    frames = [
+        bytes(8) + random.getrandbits(40).to_bytes(6, "big") + b"\r\n"
+        for _ in range(n)
+    ]
+    buffer = b"".join(frames)
+
+    start = time.perf_counter()
+    per_frame = [GOTOBAKE.decode(f) for f in frames]
+    t_frame = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = GOTOBAKE.decode_many(buffer, frame_size)
+    t_batch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    legacy = [int(f.hex()[16:28].lstrip("0") or "0", 16) for f in frames]
+    t_legacy = time.perf_counter() - start
+
+    assert per_frame == batch == legacy
+    for label, t in (("hex parse", t_legacy), ("decode", t_frame), ("decode_many", t_batch)):
+        print(f"{label:<12} {n / t / 1e6:6.2f} M frames/s")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -1,5 +1,71 @@
+"""
+Usage:
+  python scan.py          # diff two full scans (scale OFF, then ON) to find the scale
+  python scan.py --find   # return as soon as a matching scale advertises
+         [--name PREFIX] [--service UUID] [--rssi -80] [--timeout 10]
+
+The address found by either mode is cached in .scale_cache.json, and --find
+matches that address first, so pairing a known scale takes one advertisement.
+"""
+
 from bleak import BleakScanner
+import argparse
 import asyncio
+import json
+import time
+from pathlib import Path
+
+CACHE_FILE = Path(__file__).resolve().parent / ".scale_cache.json"
+
+
+def load_cached_scale():
+    try:
+        return json.loads(CACHE_FILE.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def save_cached_scale(address, name):
+    CACHE_FILE.write_text(json.dumps({"address": address, "name": name}))
+
+
+async def find_scale(name_prefixes=(), service_uuids=(), min_rssi=-80, timeout=10.0):
+    """
+    Scan with a detection callback and return (device, advertisement) for the first
+    scale that matches the cached address, or a name prefix / service UUID with RSSI
+    at least min_rssi. Returns None on timeout.
+    """
+    cached = load_cached_scale()
+    cached_address = cached["address"].upper() if cached else None
+    name_prefixes = tuple(p.lower() for p in name_prefixes)
+    service_uuids = {u.lower() for u in service_uuids}
+
+    loop = asyncio.get_running_loop()
+    found = loop.create_future()
+
+    def matches(device, adv):
+        if cached_address and device.address.upper() == cached_address:
+            return True
+        if adv.rssi is not None and adv.rssi < min_rssi:
+            return False
+        name = (adv.local_name or device.name or "").lower()
+        if name_prefixes and name.startswith(name_prefixes):
+            return True
+        return bool(service_uuids & {u.lower() for u in adv.service_uuids})
+
+    def detection_callback(device, adv):
+        if not found.done() and matches(device, adv):
+            found.set_result((device, adv))
+
+    async with BleakScanner(detection_callback=detection_callback):
+        try:
+            device, adv = await asyncio.wait_for(found, timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    save_cached_scale(device.address, adv.local_name or device.name)
+    return device, adv
+
 
 async def scan_devices():
     print("Scanning for Bluetooth devices...")
@@ -37,7 +103,37 @@ async def main():
         print("New devices detected (likely your scale):")
         for addr, info in new_devices.items():
             print(f"Name: {info['name']}, Address: {addr}, RSSI: {info['rssi']}")
+        if len(new_devices) == 1:
+            addr, info = next(iter(new_devices.items()))
+            save_cached_scale(addr, info["name"])
+            print(f"Cached {addr} for scan.py --find")
     else:
         print("No new devices detected.")
 
-asyncio.run(main())
+async def main_find(args):
+    if not (args.name or args.service or load_cached_scale()):
+        print("No cached scale. Run scan.py once, or pass --name/--service.")
+        return
+    print("Waiting for a scale to advertise...")
+    start = time.perf_counter()
+    result = await find_scale(args.name, args.service, args.rssi, args.timeout)
+    elapsed = time.perf_counter() - start
+    if not result:
+        print(f"No matching scale found within {args.timeout}s.")
+        return
+    device, adv = result
+    print(
+        f"Name: {adv.local_name or device.name or 'Unknown'}, Address: {device.address}, "
+        f"RSSI: {adv.rssi} (found in {elapsed:.2f}s)"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find the BLE scale")
+    parser.add_argument("--find", action="store_true", help="return on the first matching advertisement")
+    parser.add_argument("--name", action="append", default=[], help="device name prefix")
+    parser.add_argument("--service", action="append", default=[], help="advertised service UUID")
+    parser.add_argument("--rssi", type=int, default=-80, help="minimum RSSI")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    args = parser.parse_args()
+
+    asyncio.run(main_find(args) if args.find else main())
@@ -0,0 +1,220 @@
+# simulate.py
+"""
+Replay simulator for BLE scale captures (no Bluetooth hardware needed).
+
+ReplayDevice plays frames back through the same notification callback
+interface track.py registers with bleak (callback(sender, bytearray)), at real
+time, N times speed, or as fast as possible (--speed 0). Frames come from a
+recorded char_log.csv / .bin capture, or from a synthetic weight curve.
+
+The harness runs the refill pipeline (SampleQueue -> GOTOBAKE decoder ->
+StabilityFilter) and reports decoder throughput, queue latency and stable
+weight detection. Detection latency is measured from when the filtered signal
+settled; for the synthetic curve, whose step times are known, also from the
+step itself.
+
+Usage:
+  python simulate.py char_log.csv [--speed 10]
+  python simulate.py --synthetic [--speed 0]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Iterable, List, Sequence, Tuple
+
+from capture import SampleQueue
+from scale_protocol import GOTOBAKE
+from stabilize import StabilityFilter
+
+Frame = Tuple[int, bytes]  # (ts_ns, payload)
+
+
+def load_frames(path: str) -> List[Frame]:
+    """Read (ts_ns, payload) frames from a track.py capture (CSV or .bin)"""
+    if path.endswith(".bin"):
+        import capture
+
+        records = capture.load_capture(path)
+        return [
+            (int(r["ts_ns"]), bytes(r["data"][: r["len"]]))
+            for r in records
+        ]
+
+    import csv
+
+    with open(path, newline="") as f:
+        return [
+            (int(row["timestamp_ms"]) * 1_000_000, bytes.fromhex(row["hex"]))
+            for row in csv.DictReader(f)
+        ]
+
+
+SYNTHETIC_LEVELS = ((0, 2.0), (150, 3.0), (550, 3.0))  # (grams, seconds)
+
+
+def synthetic_steps(levels: Sequence[Tuple[float, float]] = SYNTHETIC_LEVELS) -> List[float]:
+    """Times (seconds from the first frame) at which each synthetic plateau starts"""
+    steps, t = [], 0.0
+    for _, seconds in levels:
+        steps.append(t)
+        t += seconds
+    return steps
+
+
+def synthetic_frames(
+    levels: Sequence[Tuple[float, float]] = SYNTHETIC_LEVELS,
+    rate_hz: float = 20.0,
+    noise: float = 0.5,
+    spike_rate: float = 0.02,
+    seed: int = 0,
+) -> List[Frame]:
+    """
+    GOTOBAKE frames for a weight curve of (level, seconds) plateaus with
+    gaussian noise and occasional spikes, e.g. empty scale, bottle, filled bottle.
+    """
+    rng = random.Random(seed)
+    step_ns = int(1e9 / rate_hz)
+    frames = []
+    ts = 0
+    for level, seconds in levels:
+        for _ in range(int(seconds * rate_hz)):
+            weight = level + rng.gauss(0, noise)
+            if rng.random() < spike_rate:
+                weight += 50
+            frames.append(
+                (ts, bytes(8) + max(0, int(weight)).to_bytes(6, "big") + b"\r\n")
+            )
+            ts += step_ns
+    return frames
+
+
+class ReplayDevice:
+    """Stand-in for a BleakClient that only supports start_notify/stop_notify."""
+
+    def __init__(self, frames: Iterable[Frame], speed: float = 1.0):
+        self.frames = list(frames)
+        self.speed = speed
+        self.task = None
+        self.done = asyncio.Event()
+        self.current_ts_ns = None  # capture timestamp of the frame being delivered
+
+    async def start_notify(self, _char_uuid, callback):
+        self.task = asyncio.create_task(self._play(callback))
+
+    async def stop_notify(self, _char_uuid):
+        if self.task:
+            self.task.cancel()
+
+    async def _play(self, callback):
+        if not self.frames:
+            self.done.set()
+            return
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        first_ts = self.frames[0][0]
+        for i, (ts_ns, payload) in enumerate(self.frames):
+            if self.speed > 0:
+                delay = start + (ts_ns - first_ts) / 1e9 / self.speed - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif i % 1000 == 0:
+                await asyncio.sleep(0)  # let the consumer run
+            self.current_ts_ns = ts_ns
+            callback(0, bytearray(payload))
+        self.done.set()
+
+
+async def run_pipeline(
+    frames: List[Frame], speed: float, steps: Sequence[float] = (), **filter_args
+):
+    """
+    Replay frames through the pipeline. With `steps` (known step times of a
+    synthetic curve, seconds from the first frame) detection latency is also
+    reported from the step that preceded each stable weight.
+    """
+    device = ReplayDevice(frames, speed)
+    samples = SampleQueue(maxsize=100_000)
+    stability = StabilityFilter(**filter_args)
+    capture_ts = deque()  # capture timestamps of queued frames, in order
+    queue_latency_ns = []
+    events = []
+    decode_ns = 0
+
+    def write_batch(batch):
+        nonlocal decode_ns
+        now = time.time_ns()
+        start = time.perf_counter_ns()
+        for ts_ns, payload in batch:
+            queue_latency_ns.append(now - ts_ns)
+            weight = GOTOBAKE.decode(payload)
+            ts = capture_ts.popleft() / 1e9
+            if weight is not None:
+                event = stability.update(ts, weight)
+                if event:
+                    events.append(event)
+        decode_ns += time.perf_counter_ns() - start
+
+    def callback(sender, data):
+        dropped = samples.dropped
+        samples.callback(sender, data)
+        if samples.dropped == dropped:
+            capture_ts.append(device.current_ts_ns)
+
+    consumer = asyncio.create_task(samples.consume(write_batch))
+    wall_start = time.perf_counter()
+    await device.start_notify(None, callback)
+    await device.done.wait()
+    await samples.close()
+    await consumer
+    wall = time.perf_counter() - wall_start
+
+    n = samples.written
+    print(f"Replayed {len(frames)} frames in {wall:.2f}s (speed {speed or 'max'})")
+    print(f"  dropped={samples.dropped} late={samples.late}")
+    if n:
+        print(f"  decode+filter: {n / (decode_ns / 1e9) / 1e6:.2f} M frames/s")
+        latencies = sorted(queue_latency_ns)
+        p50 = latencies[len(latencies) // 2] / 1e6
+        p99 = latencies[int(len(latencies) * 0.99)] / 1e6
+        print(f"  queue latency: p50={p50:.3f} ms p99={p99:.3f} ms max={latencies[-1] / 1e6:.3f} ms")
+    t0 = frames[0][0] / 1e9 if frames else 0
+    for e in events:
+        t = e.ts - t0
+        detail = f"{e.latency * 1000:.0f} ms after settling"
+        step = max((s for s in steps if s <= t), default=None)
+        if step is not None:
+            detail = f"{(t - step) * 1000:.0f} ms from the step at {step:.1f}s, " + detail
+        print(f"  stable weight {e.weight:10.1f} at t={t:8.3f}s (detection latency {detail})")
+    return events
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay BLE scale captures")
+    parser.add_argument("path", nargs="?", help="CSV or .bin capture from track.py")
+    parser.add_argument("--synthetic", action="store_true", help="use a synthetic weight curve")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed (0 = as fast as possible)")
+    parser.add_argument("--tolerance", type=float, default=2.0)
+    parser.add_argument("--hold", type=float, default=0.5)
+    args = parser.parse_args()
+
+    steps = []
+    if args.synthetic:
+        frames = synthetic_frames()
+        steps = synthetic_steps()
+    elif args.path:
+        frames = load_frames(args.path)
+    else:
+        parser.error("give a capture path or --synthetic")
+
+    asyncio.run(
+        run_pipeline(
+            frames, args.speed, steps, tolerance=args.tolerance, hold_time=args.hold
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
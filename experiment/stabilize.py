@@ -0,0 +1,144 @@
+# stabilize.py
+"""
+Streaming weight-stabilization filter for live refill measurement.
+
+StabilityFilter consumes decoded weights one sample at a time (O(1) per sample:
+a small fixed moving-median window followed by an EMA) and emits a StableWeight
+event once the smoothed weight stays within `tolerance` for `hold_time` seconds.
+One event is emitted per plateau, e.g. the tared empty bottle, then the filled
+bottle. Its latency is measured from when the median-filtered signal entered
+the tolerance band around the detected weight (and stayed there), so it
+includes the EMA's lag as well as the hold time.
+
+Usage (replay harness over a recorded capture, CSV or .bin from track.py):
+  python stabilize.py char_log.csv [--tolerance 2] [--hold 0.5] [--window 5] [--alpha 0.3]
+"""
+
+import argparse
+import bisect
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+@dataclass
+class StableWeight:
+    ts: float  # seconds, time of detection
+    weight: float  # smoothed weight at detection
+    settled_at: float  # seconds, when the filtered signal settled at `weight`
+
+    @property
+    def latency(self) -> float:
+        """Time from the weight settling to the event being emitted"""
+        return self.ts - self.settled_at
+
+
+class StabilityFilter:
+    def __init__(
+        self,
+        window: int = 5,
+        alpha: float = 0.3,
+        tolerance: float = 2.0,
+        hold_time: float = 0.5,
+        max_settle: float = 5.0,
+    ):
+        self.window = window
+        self.alpha = alpha
+        self.tolerance = tolerance
+        self.hold_time = hold_time
+        self.max_settle = max_settle  # how far back latency is measured
+
+        self.history: deque = deque()  # (ts, median) for the last max_settle seconds
+        self.recent: deque = deque()  # arrival order
+        self.sorted: List[float] = []  # same samples, sorted (for the median)
+        self.ema: Optional[float] = None
+
+        self.anchor: Optional[float] = None  # value the current run started at
+        self.run_start: Optional[float] = None
+        self.emitted = False
+
+    def _median(self, weight: float) -> float:
+        self.recent.append(weight)
+        bisect.insort(self.sorted, weight)
+        if len(self.recent) > self.window:
+            old = self.recent.popleft()
+            del self.sorted[bisect.bisect_left(self.sorted, old)]
+        return self.sorted[len(self.sorted) // 2]
+
+    def _settled_at(self, weight: float) -> float:
+        """Start of the latest unbroken run of medians within tolerance of weight"""
+        settled_at = self.history[-1][0]
+        for ts, median in reversed(self.history):
+            if abs(median - weight) > self.tolerance:
+                break
+            settled_at = ts
+        return settled_at
+
+    def update(self, ts: float, weight: float) -> Optional[StableWeight]:
+        """Feed one sample (ts in seconds). Returns an event when a plateau is detected."""
+        median = self._median(weight)
+        self.history.append((ts, median))
+        while self.history[0][0] < ts - self.max_settle:
+            self.history.popleft()
+        self.ema = median if self.ema is None else self.ema + self.alpha * (median - self.ema)
+
+        if self.anchor is None or abs(self.ema - self.anchor) > self.tolerance:
+            # weight is moving: start a new run
+            self.anchor = self.ema
+            self.run_start = ts
+            self.emitted = False
+            return None
+
+        if not self.emitted and ts - self.run_start >= self.hold_time:
+            self.emitted = True
+            return StableWeight(
+                ts=ts, weight=self.ema, settled_at=self._settled_at(self.ema)
+            )
+        return None
+
+    def run(self, samples: Iterable[Tuple[float, float]]) -> Iterator[StableWeight]:
+        for ts, weight in samples:
+            event = self.update(ts, weight)
+            if event:
+                yield event
+
+
+def replay(path: str, **filter_args) -> List[StableWeight]:
+    """Run the filter over a recorded capture and print each stable weight"""
+    from graph import load_capture
+
+    df = load_capture(path)
+    ts = df["timestamp"].astype("int64").to_numpy() / 1e9
+    weights = df["weight_val"].to_numpy(dtype=float)
+
+    events = list(StabilityFilter(**filter_args).run(zip(ts.tolist(), weights.tolist())))
+    for e in events:
+        print(f"t={e.ts - ts[0]:9.3f}s  weight={e.weight:12.1f}  latency={e.latency * 1000:7.1f} ms")
+    if events:
+        latencies = sorted(e.latency for e in events)
+        print(
+            f"{len(events)} stable weights over {len(df)} samples, "
+            f"median latency {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+            f"max {latencies[-1] * 1000:.1f} ms"
+        )
+    else:
+        print(f"No stable weight detected over {len(df)} samples")
+    return events
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a capture through StabilityFilter")
+    parser.add_argument("path", help="CSV or .bin capture from track.py")
+    parser.add_argument("--window", type=int, default=5)
+    parser.add_argument("--alpha", type=float, default=0.3)
+    parser.add_argument("--tolerance", type=float, default=2.0)
+    parser.add_argument("--hold", type=float, default=0.5)
+    args = parser.parse_args()
+
+    replay(
+        args.path,
+        window=args.window,
+        alpha=args.alpha,
+        tolerance=args.tolerance,
+        hold_time=args.hold,
+    )
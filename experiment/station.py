@@ -0,0 +1,150 @@
+# station.py
+"""
+Capture every scale at a station from one process.
+
+One asyncio loop holds a BleakClient per device. Each device gets its own
+SampleQueue and output stream (<out-dir>/<NAME>.csv or .bin), and reconnects
+with exponential backoff when the scale drops or is switched off.
+
+Usage:
+  1) Put scale addresses in .env (GOTOBAKE_ADDRESS, HOTO_ADDRESS, LFC_ADDRESS);
+     every address that is set is captured.
+  2) Run: python station.py <characteristic UUID> [--format bin] [--out-dir captures]
+     or give devices explicitly: --device NAME=ADDRESS (repeatable)
+  3) Stop with Ctrl+C.
+"""
+
+import argparse
+import asyncio
+import os
+from pathlib import Path
+from typing import Dict
+
+from bleak import BleakClient, BleakScanner
+
+from capture import SampleQueue
+from track import (
+    GOTOBAKE_ADDRESS,
+    HOTO_ADDRESS,
+    LFC_ADDRESS,
+    find_characteristic,
+    open_sink,
+    supports_notify,
+)
+
+ENV_DEVICES = {
+    "GOTOBAKE": GOTOBAKE_ADDRESS,
+    "HOTO": HOTO_ADDRESS,
+    "LFC": LFC_ADDRESS,
+}
+
+
+async def capture_device(
+    name: str,
+    address: str,
+    char_uuid: str,
+    out_file: str,
+    capture_format: str = "csv",
+    poll_interval: float = 0.5,
+    min_backoff: float = 1.0,
+    max_backoff: float = 30.0,
+):
+    """Capture one device until cancelled, reconnecting with backoff."""
+    sink = open_sink(capture_format, out_file)
+    samples = SampleQueue()
+    writer_task = asyncio.create_task(samples.consume(sink.write_batch))
+    backoff = min_backoff
+
+    try:
+        while True:
+            try:
+                device = await BleakScanner.find_device_by_address(address, timeout=10.0)
+                if not device:
+                    raise ConnectionError("device not found")
+
+                disconnected = asyncio.Event()
+                async with BleakClient(
+                    device, timeout=30.0, disconnected_callback=lambda _: disconnected.set()
+                ) as client:
+                    _, target_char = await find_characteristic(client, char_uuid)
+                    if not target_char:
+                        print(f"[{name}] characteristic {char_uuid} not found. Giving up.")
+                        return
+
+                    print(f"[{name}] connected ({address})")
+                    backoff = min_backoff
+                    if supports_notify(target_char):
+                        await client.start_notify(target_char.uuid, samples.callback)
+                        await disconnected.wait()
+                    else:
+                        while not disconnected.is_set():
+                            samples.push(bytes(await client.read_gatt_char(target_char.uuid)))
+                            await asyncio.sleep(poll_interval)
+                print(f"[{name}] disconnected ({samples.stats()})")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[{name}] {e}; retrying in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, max_backoff)
+    finally:
+        await samples.close()
+        await writer_task
+        sink.close()
+        print(f"[{name}] capture finished: {samples.stats()}")
+
+
+async def supervise(
+    devices: Dict[str, str],
+    char_uuid: str,
+    out_dir: str = ".",
+    capture_format: str = "csv",
+):
+    """Run capture_device for every {name: address} under one event loop."""
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    tasks = [
+        asyncio.create_task(
+            capture_device(
+                name,
+                address,
+                char_uuid,
+                os.path.join(out_dir, f"{name}.{capture_format}"),
+                capture_format,
+            ),
+            name=name,
+        )
+        for name, address in devices.items()
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Capture all scales at a station")
+    parser.add_argument("char_uuid", help="characteristic UUID to monitor")
+    parser.add_argument("--device", action="append", default=[], metavar="NAME=ADDRESS")
+    parser.add_argument("--format", choices=("csv", "bin"), default="csv")
+    parser.add_argument("--out-dir", default=".")
+    args = parser.parse_args()
+
+    if args.device:
+        devices = dict(d.split("=", 1) for d in args.device)
+    else:
+        devices = {name: addr for name, addr in ENV_DEVICES.items() if addr}
+    if not devices:
+        print("No devices configured. Set *_ADDRESS in .env or pass --device.")
+        return
+
+    print("Capturing:", ", ".join(f"{n} ({a})" for n, a in devices.items()))
+    try:
+        asyncio.run(supervise(devices, args.char_uuid, args.out_dir, args.format))
+    except KeyboardInterrupt:
+        print("\nInterrupted by user. Exiting.")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,8 @@ Usage:
      - You will be prompted for:
          * device address (press Enter to use env TARGET)
          * characteristic UUID to monitor (required)
-         * csv filename (optional, default: char_log.csv)
+         * capture format: csv (default) or bin (fixed-width binary, see capture.py)
+         * output filename (optional, default: char_log.csv / char_log.bin)
   3) If characteristic supports notify -> script subscribes and logs notifications.
      Otherwise -> script polls read() periodically (default 0.5s).
   4) Stop with Ctrl+C.
@@ -20,8 +21,8 @@ Notes:
 import asyncio
 import csv
 import os
+import struct
 import sys
-import time
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -30,6 +31,8 @@ from dotenv import load_dotenv
 from bleak import BleakClient, BleakScanner
 from bleak.backends.characteristic import BleakGATTCharacteristic
 
+from capture import CaptureWriter, SampleQueue
+
 # --- Load .env from repo root (two levels up from this file? adjust if needed) ---
 dotenv_path = Path(__file__).resolve().parent.parent / ".env"
 if dotenv_path.exists():
@@ -46,6 +49,12 @@ HOTO_ADDRESS = os.getenv("HOTO_ADDRESS")
 LFC_ADDRESS = os.getenv("LFC_ADDRESS")
 
 ENV_TARGET = GOTOBAKE_ADDRESS
+# Precompiled float layouts used by interpretations_from_bytes
+F32_LE = struct.Struct("<f")
+F32_BE = struct.Struct(">f")
+F64_LE = struct.Struct("<d")
+F64_BE = struct.Struct(">d")
+
 # Helper parse attempts for raw bytes
 def interpretations_from_bytes(b: bytes):
     """Return several interpretations of raw bytes to help identify format."""
@@ -55,37 +64,67 @@ def interpretations_from_bytes(b: bytes):
     # signed/unsigned ints little-endian for 1..8 bytes if available
     for size in (1, 2, 4, 8):
         if len(b) >= size:
-            try:
-                val_u = int.from_bytes(b[:size], byteorder="little", signed=False)
-                val_s = int.from_bytes(b[:size], byteorder="little", signed=True)
-                res[f"u{size}le"] = val_u
-                res[f"s{size}le"] = val_s
-            except Exception:
-                pass
-            try:
-                val_u_be = int.from_bytes(b[:size], byteorder="big", signed=False)
-                val_s_be = int.from_bytes(b[:size], byteorder="big", signed=True)
-                res[f"u{size}be"] = val_u_be
-                res[f"s{size}be"] = val_s_be
-            except Exception:
-                pass
+            head = b[:size]
+            res[f"u{size}le"] = int.from_bytes(head, byteorder="little", signed=False)
+            res[f"s{size}le"] = int.from_bytes(head, byteorder="little", signed=True)
+            res[f"u{size}be"] = int.from_bytes(head, byteorder="big", signed=False)
+            res[f"s{size}be"] = int.from_bytes(head, byteorder="big", signed=True)
     # float32/float64 attempts (if length >=4/8)
     if len(b) >= 4:
-        import struct
-        try:
-            res["f32_le"] = struct.unpack("<f", b[:4])[0]
-            res["f32_be"] = struct.unpack(">f", b[:4])[0]
-        except Exception:
-            pass
+        res["f32_le"] = F32_LE.unpack_from(b)[0]
+        res["f32_be"] = F32_BE.unpack_from(b)[0]
     if len(b) >= 8:
-        import struct
-        try:
-            res["f64_le"] = struct.unpack("<d", b[:8])[0]
-            res["f64_be"] = struct.unpack(">d", b[:8])[0]
-        except Exception:
-            pass
+        res["f64_le"] = F64_LE.unpack_from(b)[0]
+        res["f64_be"] = F64_BE.unpack_from(b)[0]
     return res
 
+
+class CsvSink:
+    """Text log: (timestamp_iso, timestamp_ms, hex, len, interpretation) rows"""
+
+    def __init__(self, path: str, kind: str = "RAW"):
+        csv_exists = Path(path).exists()
+        self.kind = kind
+        self.f = open(path, "a", newline="")
+        self.writer = csv.writer(self.f)
+        if not csv_exists:
+            # header
+            self.writer.writerow(["timestamp_iso", "timestamp_ms", "hex", "len", "interpretation"])
+
+    def write_batch(self, batch):
+        rows = []
+        for ts_ns, b in batch:
+            ts_iso = datetime.utcfromtimestamp(ts_ns / 1e9).isoformat()
+            ts_ms = ts_ns // 1_000_000
+            interp = interpretations_from_bytes(b)
+            # string version of interpretation small summary
+            interp_summary = "; ".join(f"{k}={v}" for k, v in list(interp.items())[:6])
+            print(f"[{ts_iso}] {self.kind} hex={b.hex()} len={len(b)} -> {interp_summary}")
+            rows.append([ts_iso, ts_ms, b.hex(), len(b), interp_summary])
+        self.writer.writerows(rows)
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+class BinarySink:
+    """Fixed-width binary capture (see capture.py)"""
+
+    def __init__(self, path: str):
+        self.writer = CaptureWriter(path)
+
+    def write_batch(self, batch):
+        for ts_ns, b in batch:
+            self.writer.write(b, ts_ns)
+
+    def close(self):
+        self.writer.close()
+
+
+def open_sink(capture_format: str, path: str, kind: str = "RAW"):
+    return BinarySink(path) if capture_format == "bin" else CsvSink(path, kind)
+
 async def choose_device(provided_address: Optional[str] = None, timeout: float = 10.0):
     """If provided_address given, try to find it; otherwise let user pick from scanned devices."""
     if provided_address:
@@ -114,11 +153,41 @@ async def choose_device(provided_address: Optional[str] = None, timeout: float =
         print("Invalid selection.")
         return None
 
-async def monitor_characteristic(address: str, char_uuid: str, csv_file: str, poll_interval: float = 0.5):
+async def find_characteristic(client: BleakClient, char_uuid: str):
+    """Return (services, characteristic or None) for char_uuid on a connected client."""
+    try:
+        # ensure services loaded
+        services = await client.get_services()
+    except Exception:
+        # fallback to client.services if available
+        services = getattr(client, "services", None)
+
+    # find characteristic object (if possible)
+    for srv in services:
+        for ch in srv.characteristics:
+            if ch.uuid.lower() == char_uuid.lower():
+                return services, ch
+    return services, None
+
+
+def supports_notify(char: BleakGATTCharacteristic) -> bool:
+    return "notify" in char.properties or "indicate" in char.properties
+
+async def monitor_characteristic(
+    address: str,
+    char_uuid: str,
+    out_file: str,
+    poll_interval: float = 0.5,
+    capture_format: str = "csv",
+):
     """
     Connect, determine if notify supported. If notify -> subscribe.
     Otherwise poll read() every poll_interval seconds.
-    Log (timestamp_iso, raw_hex, interpretations...) to CSV.
+    capture_format "csv": log (timestamp_iso, raw_hex, interpretations...) to CSV.
+    capture_format "bin": append fixed-width binary records (capture.py), buffered
+    with periodic fsync and no per-sample printing; graph.py can memory-map it.
+    The BLE callback only enqueues (ts_ns, bytes); a writer task decodes and
+    writes in batches and counts dropped/late samples.
     """
     print(f"Connecting to {address} ...")
     device = await BleakScanner.find_device_by_address(address, timeout=10.0)
@@ -127,23 +196,8 @@ async def monitor_characteristic(address: str, char_uuid: str, csv_file: str, po
         return
 
     async with BleakClient(device, timeout=30.0) as client:
-        try:
-            # ensure services loaded
-            services = await client.get_services()
-        except Exception:
-            # fallback to client.services if available
-            services = getattr(client, "services", None)
-
         print("Connected:", client.is_connected)
-        # find characteristic object (if possible)
-        target_char: Optional[BleakGATTCharacteristic] = None
-        for srv in services:
-            for ch in srv.characteristics:
-                if ch.uuid.lower() == char_uuid.lower():
-                    target_char = ch
-                    break
-            if target_char:
-                break
+        services, target_char = await find_characteristic(client, char_uuid)
 
         if not target_char:
             print("Characteristic UUID not found on device. Available characteristics:")
@@ -154,29 +208,18 @@ async def monitor_characteristic(address: str, char_uuid: str, csv_file: str, po
 
         print(f"Found characteristic {target_char.uuid} with props: {target_char.properties}")
 
-        # open CSV
-        csv_exists = Path(csv_file).exists()
-        with open(csv_file, "a", newline="") as f:
-            writer = csv.writer(f)
-            if not csv_exists:
-                # header
-                writer.writerow(["timestamp_iso", "timestamp_ms", "hex", "len", "interpretation"])
-
-            async def handle_notify(_: int, data: bytearray):
-                ts_iso = datetime.utcnow().isoformat()
-                ts_ms = int(time.time() * 1000)
-                b = bytes(data)
-                interp = interpretations_from_bytes(b)
-                # string version of interpretation small summary
-                interp_summary = "; ".join(f"{k}={v}" for k, v in list(interp.items())[:6])
-                print(f"[{ts_iso}] RAW hex={b.hex()} len={len(b)} -> {interp_summary}")
-                writer.writerow([ts_iso, ts_ms, b.hex(), len(b), interp_summary])
-                f.flush()
+        notify = supports_notify(target_char)
+
+        # open output (CSV text log or binary capture, see capture.py)
+        sink = open_sink(capture_format, out_file, "RAW" if notify else "READ")
+        samples = SampleQueue()
+        writer_task = asyncio.create_task(samples.consume(sink.write_batch))
 
+        try:
             # If notify supported -> subscribe
-            if "notify" in target_char.properties or "indicate" in target_char.properties:
+            if notify:
                 print("Characteristic supports notify -> starting notifications.")
-                await client.start_notify(target_char.uuid, handle_notify)
+                await client.start_notify(target_char.uuid, samples.callback)
                 print("Notifications started. Press Ctrl+C to stop.")
                 try:
                     while True:
@@ -191,17 +234,15 @@ async def monitor_characteristic(address: str, char_uuid: str, csv_file: str, po
                 try:
                     while True:
                         data = await client.read_gatt_char(target_char.uuid)
-                        ts_iso = datetime.utcnow().isoformat()
-                        ts_ms = int(time.time() * 1000)
-                        b = bytes(data)
-                        interp = interpretations_from_bytes(b)
-                        interp_summary = "; ".join(f"{k}={v}" for k, v in list(interp.items())[:6])
-                        print(f"[{ts_iso}] READ hex={b.hex()} len={len(b)} -> {interp_summary}")
-                        writer.writerow([ts_iso, ts_ms, b.hex(), len(b), interp_summary])
-                        f.flush()
+                        samples.push(bytes(data))
                         await asyncio.sleep(poll_interval)
                 except asyncio.CancelledError:
                     pass
+        finally:
+            await samples.close()
+            await writer_task
+            sink.close()
+            print(f"Capture finished: {samples.stats()}")
 
 async def main_cli():
     print("=== BLE characteristic tracker ===")
@@ -238,7 +279,12 @@ async def main_cli():
         print("Characteristic UUID is required. Exiting.")
         return
 
-    csv_file = input("CSV file to append (default: char_log.csv): ").strip() or "char_log.csv"
+    capture_format = input("Capture format csv/bin (default: csv): ").strip().lower() or "csv"
+    if capture_format not in ("csv", "bin"):
+        print("Unknown capture format. Exiting.")
+        return
+    default_file = f"char_log.{capture_format}"
+    out_file = input(f"File to append (default: {default_file}): ").strip() or default_file
     poll = input("Poll interval in seconds if no notify (default 0.5): ").strip()
     try:
         poll_interval = float(poll) if poll else 0.5
@@ -246,7 +292,7 @@ async def main_cli():
         poll_interval = 0.5
 
     try:
-        await monitor_characteristic(addr, char_uuid, csv_file, poll_interval)
+        await monitor_characteristic(addr, char_uuid, out_file, poll_interval, capture_format)
     except KeyboardInterrupt:
         print("\nInterrupted by user. Exiting.")
     except Exception as e:
@@ -10,10 +10,13 @@ export {
   registerKiosk,
   getKiosk,
   getKioskProducts,
+  syncKiosk,
   addProductToKiosk,
   deleteProductFromKiosk,
 } from "./kiosk.js";
 
 export { preparePayment, approvePayment } from "./payment.js";
 
+export { sendWeightTelemetry } from "./telemetry.js";
+
 export { request, BASE_URL } from "./client.js";
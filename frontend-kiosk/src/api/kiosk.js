@@ -29,6 +29,16 @@ import { request } from "./client.js";
  * @property {Array<{product: Object, available: boolean}>} products - 제품 목록
  */
 
+/**
+ * 키오스크 동기화 응답
+ * @typedef {Object} KioskSyncResponse
+ * @property {string} kid - 키오스크 ID
+ * @property {number} version - 현재 카탈로그 버전
+ * @property {boolean} full - 전체 스냅샷 여부 (false면 변경분만 포함)
+ * @property {Array<{product: Object, available: boolean}>} products - 추가/변경된 제품 목록
+ * @property {string[]} removed - 제거된 제품 ID 목록
+ */
+
 /**
  * API 응답 메시지
  * @typedef {Object} ApiMessageResponse
@@ -65,6 +75,16 @@ export async function getKioskProducts(kioskId) {
   return request(`/kiosks/${kioskId}/products`);
 }
 
+/**
+ * 마지막으로 받은 버전 이후의 키오스크 제품 변경분 조회
+ * @param {string} kioskId - 키오스크 ID
+ * @param {number} [since=0] - 마지막으로 동기화한 카탈로그 버전 (0이면 전체)
+ * @returns {Promise<KioskSyncResponse>} 변경된 제품 및 제거된 제품 ID
+ */
+export async function syncKiosk(kioskId, since = 0) {
+  return request(`/kiosks/${kioskId}/sync?since=${since}`);
+}
+
 /**
  * 키오스크에 제품 추가
  * @param {string} kioskId - 키오스크 ID
@@ -0,0 +1,46 @@
+import { request } from "./client.js";
+
+/**
+ * 무게 측정 배치 데이터
+ * @typedef {Object} WeightTelemetryBatch
+ * @property {string} kid - 키오스크 ID
+ * @property {string} session_id - 측정 세션 ID
+ * @property {Array<[number, number]>} samples - [timestamp_ms, grams] 목록
+ * @property {string} [txid] - 연결할 거래 ID
+ * @property {number} [stable_weight] - 최종 안정 무게 (gram)
+ */
+
+/**
+ * 무게 측정 배치 응답
+ * @typedef {Object} WeightTelemetryResponse
+ * @property {number} accepted - 저장된 샘플 수
+ * @property {number} buckets - 기록된 분 단위 문서 수
+ */
+
+/**
+ * gzip 압축 (CompressionStream 미지원 브라우저에서는 null)
+ * @param {string} text - 압축할 문자열
+ * @returns {Promise<Blob|null>}
+ */
+async function gzip(text) {
+  if (typeof CompressionStream === "undefined") return null;
+  const stream = new Blob([text])
+    .stream()
+    .pipeThrough(new CompressionStream("gzip"));
+  return new Response(stream).blob();
+}
+
+/**
+ * 무게 측정 샘플 배치 전송 (가능하면 gzip 압축)
+ * @param {WeightTelemetryBatch} batch - 측정 배치
+ * @returns {Promise<WeightTelemetryResponse>} 저장 결과
+ */
+export async function sendWeightTelemetry(batch) {
+  const body = JSON.stringify(batch);
+  const compressed = await gzip(body);
+  return request("/telemetry/weights", {
+    method: "POST",
+    body: compressed || body,
+    headers: compressed ? { "Content-Encoding": "gzip" } : {},
+  });
+}
@@ -4,6 +4,13 @@ export async function getTransactions(params = {}) {
   const queryParams = new URLSearchParams();
 
   if (params.kioskId) queryParams.append('kiosk_id', params.kioskId);
+  if (params.status) queryParams.append('status', params.status);
+  if (params.paymentMethod) queryParams.append('payment_method', params.paymentMethod);
+  if (params.manager) queryParams.append('manager', params.manager);
+  if (params.pid) queryParams.append('pid', params.pid);
+  // Dates (YYYY-MM-DD) are whole days in KST; the end date is inclusive
+  if (params.startDate) queryParams.append('start_date', params.startDate);
+  if (params.endDate) queryParams.append('end_date', `${params.endDate}T23:59:59.999`);
   if (params.limit) queryParams.append('limit', params.limit);
 
   const query = queryParams.toString();